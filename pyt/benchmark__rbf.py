@@ -0,0 +1,277 @@
+import os, sys, time, json, csv, resource
+import numpy            as np
+import multiprocessing  as mp
+import morph__rbf       as mph
+
+# ========================================================= #
+# ===  scaling benchmark of the rbf morphing pipeline   === #
+# ========================================================= #
+#  -- sweeps boundary count M and node count N on synthetic geometries
+#     ( + the cylinder mesh of generate__cylinders.py ), times each phase ::
+#       assemble_G, factorize, solve, assemble_R, apply  ( interpolate :: wall time of apply )
+#  -- peak RSS is measured per case in a fresh process, accuracy against the
+#     loop reference ( test__rbf_forloop_ver.py style ) on a sample of nodes.
+#  -- results :: list of dict, saved as .json or .csv ( by extension of outFile )
+#  -- interpolation runs through RBFMorpher.apply ( cache / parallel / float32 paths included ),
+#     assemble_R / apply split it into kernel evaluation and R @ alpha ( nan on parallel runs )
+#  -- maxMemory [MB] bounds the R block of the global engines ( N = 1e5, M = 3000 would
+#     otherwise build 7 GB temporaries in one call )
+
+maxMemory_default = 512
+engines_default = { "gaussian"   :{ "rbfType":"gaussian"   , "coef":0.2, \
+                                    "maxMemory":maxMemory_default }, \
+                    "wendland_c2":{ "rbfType":"wendland_c2", "coef":0.4, \
+                                    "maxMemory":maxMemory_default }, \
+                    "pou"        :{ "rbfType":"gaussian"   , "coef":0.2, \
+                                    "engine":"pou", "patchRadius":0.5 } }
+
+def benchmark__rbf( geometries=[ "planes", "cube", "cylinder" ], \
+                    nBoundaries=[ 100, 300, 1000, 3000 ], nNodes=[ 1000, 10000, 100000 ], \
+                    engines=None, nSample=200, isolate=True, outFile="bench.json", \
+                    mshFile="msh/model.msh" ):
+
+    # ------------------------------------------------- #
+    # --- [1] cases                                 --- #
+    # ------------------------------------------------- #
+    if ( engines is None ): engines = engines_default
+    cases = []
+    for geometry in geometries:
+        sizes = [ (None,None) ] if ( geometry == "cylinder" ) else \
+                [ (nB,nN) for nB in nBoundaries for nN in nNodes ]
+        for nB,nN in sizes:
+            for name,settings in engines.items():
+                cases += [ { "geometry":geometry, "nBoundary":nB, "nNode":nN, "engine":name, \
+                             "settings":settings, "nSample":nSample, "mshFile":mshFile } ]
+
+    # ------------------------------------------------- #
+    # --- [2] run ( one process per case for RSS )  --- #
+    # ------------------------------------------------- #
+    results = []
+    for case in cases:
+        if ( isolate ):
+            with mp.get_context( "spawn" ).Pool( processes=1 ) as pool:
+                result = pool.apply( run__case, ( case, ) )
+        else:
+            result = run__case( case )
+        results += [ result ]
+        print( "[benchmark__rbf] {geometry:>8} {engine:>12} M={nBoundary:>7} N={nNode:>8} :: "
+               "G={assemble_G:.3f} fac={factorize:.3f} solve={solve:.3f} "
+               "R={assemble_R:.3f} apply={apply:.3f} [s]  rss={peakRSS_MB:.1f} MB  "
+               "err={error:.2e}".format( **result ) )
+
+    # ------------------------------------------------- #
+    # --- [3] save                                  --- #
+    # ------------------------------------------------- #
+    if ( outFile is not None ):
+        save__results( results=results, outFile=outFile )
+    return( results )
+
+
+# ========================================================= #
+# ===  one benchmark case                               === #
+# ========================================================= #
+
+def run__case( case=None ):
+
+    # ------------------------------------------------- #
+    # --- [1] geometry                              --- #
+    # ------------------------------------------------- #
+    boundaries, displacement, nodes = make__geometry( geometry=case["geometry"], \
+                                                      nBoundary=case["nBoundary"], \
+                                                      nNode=case["nNode"], \
+                                                      mshFile=case["mshFile"] )
+    settings = dict( case["settings"] )
+    engine   = settings.pop( "engine", "global" )
+    timer    = time.perf_counter
+    ret      = { key:case[key] for key in [ "geometry", "engine" ] }
+    ret.update( { "nBoundary":boundaries.shape[0], "nNode":nodes.shape[0], \
+                  "rbfType":settings["rbfType"], "coef":settings["coef"] } )
+
+    # ------------------------------------------------- #
+    # --- [2] phases                                --- #
+    # ------------------------------------------------- #
+    if ( engine == "pou" ):
+        return( run__pou( case=case, ret=ret, boundaries=boundaries, displacement=displacement, \
+                          nodes=nodes, settings=settings ) )
+    time0    = timer()
+    morpher  = mph.RBFMorpher( boundaries=boundaries, deferred=True, **settings )
+    Gmat     = morpher.assemble()
+    time1    = timer()
+    morpher.factorize( Gmat=Gmat )
+    del( Gmat )
+    time2    = timer()
+    morpher.fit( displacement=displacement )
+    time3    = timer()
+    #  -- kernel evaluation ( R ) and R @ alphas are timed inside the blockwise loop of apply
+    timings  = {}
+    results  = morpher.apply( nodes=nodes, timings=timings )
+    time4    = timer()
+    ret.update( { "assemble_G":time1-time0, "factorize":time2-time1, "solve":time3-time2, \
+                  "assemble_R":timings.get( "R", np.nan ), "apply":timings.get( "apply", np.nan ), \
+                  "interpolate":time4-time3, "total":time4-time0 } )
+    return( check__case( case=case, ret=ret, boundaries=boundaries, displacement=displacement, \
+                         nodes=nodes, results=results, settings=settings ) )
+
+
+# ========================================================= #
+# ===  partition of unity engine ( morph__pou.py )      === #
+# ========================================================= #
+
+def run__pou( case=None, ret=None, boundaries=None, displacement=None, nodes=None, \
+              settings=None ):
+    import morph__pou as mpu
+    timer    = time.perf_counter
+    time0    = timer()
+    morpher  = mpu.PUMorpher( boundaries=boundaries, **settings )
+    time1    = timer()
+    morpher.fit( displacement=displacement )
+    time2    = timer()
+    results  = morpher.apply( nodes=nodes )
+    time3    = timer()
+    ret.update( { "assemble_G":0.0, "factorize":time1-time0, "solve":time2-time1, \
+                  "assemble_R":0.0, "apply":time3-time2, "interpolate":time3-time2, \
+                  "total":time3-time0 } )
+    return( check__case( case=case, ret=ret, boundaries=boundaries, displacement=displacement, \
+                         nodes=nodes, results=results, settings=settings ) )
+
+
+# ========================================================= #
+# ===  peak RSS & accuracy of a case                    === #
+# ========================================================= #
+
+def check__case( case=None, ret=None, boundaries=None, displacement=None, nodes=None, \
+                 results=None, settings=None ):
+    ret["peakRSS_MB"] = resource.getrusage( resource.RUSAGE_SELF ).ru_maxrss / 1024.0
+    sample            = np.linspace( 0, nodes.shape[0]-1, min( case["nSample"], nodes.shape[0] ) )
+    sample            = sample.astype( np.int64 )
+    reference         = reference__loop( boundaries=boundaries, displacement=displacement, \
+                                         nodes=nodes[sample], rbfType=settings["rbfType"], \
+                                         coef=settings["coef"] )
+    ret["error"]      = float( np.max( np.abs( results[sample] - reference ) ) )
+    return( ret )
+
+
+# ========================================================= #
+# ===  loop reference ( test__rbf_forloop_ver.py )      === #
+# ========================================================= #
+
+def reference__loop( boundaries=None, displacement=None, nodes=None, rbfType="gaussian", \
+                     coef=1.0 ):
+    rbf_func = mph.get__rbfFunction( rbfType=rbfType )
+    nTrain   = boundaries.shape[0]
+    Gmat     = np.zeros( (nTrain,nTrain) )
+    for ik in range( nTrain ):
+        Gmat[ik,:] = rbf_func( boundaries[ik,:], boundaries, coef=coef )
+    alphas   = np.linalg.solve( Gmat, displacement )
+    results  = np.zeros_like( nodes )
+    for ik in range( nodes.shape[0] ):
+        results[ik,:] = nodes[ik,:] + np.dot( rbf_func( nodes[ik,:], boundaries, coef=coef ), alphas )
+    return( results )
+
+
+# ========================================================= #
+# ===  synthetic / mesh geometries                      === #
+# ========================================================= #
+
+def make__geometry( geometry="planes", nBoundary=1000, nNode=10000, mshFile=None, seed=0 ):
+
+    x_, y_, z_ = 0, 1, 2
+    rng        = np.random.default_rng( seed )
+    radius     = 1.050
+
+    # ------------------------------------------------- #
+    # --- [1] cylinder mesh ( msh/model.msh )       --- #
+    # ------------------------------------------------- #
+    if   ( geometry == "cylinder" ):
+        import load__mshFile          as lms
+        import extract__boundaryFaces as ebf
+        mesh     = lms.load__mshFile( mshFile=mshFile )
+        boundary = ebf.extract__boundaryFaces( cells=mesh["cells"], physnums=mesh["physnums"], \
+                                               points=mesh["points"], featureAngle=30.0, \
+                                               mshFile=mshFile )
+        index    = [ ebf.find__patchByNormal( boundary=boundary, normal=[0.0,0.0,+1.0] ), \
+                     boundary["interface_301_302"], \
+                     ebf.find__patchByNormal( boundary=boundary, normal=[0.0,0.0,-1.0] ) ]
+        nodes    = mesh["points"]
+        planes   = [ nodes[idx] for idx in index ]
+
+    # ------------------------------------------------- #
+    # --- [2] three discs ( execute__morphing.py )  --- #
+    # ------------------------------------------------- #
+    elif ( geometry == "planes" ):
+        nPlane   = [ nBoundary//3, nBoundary//3, nBoundary - 2*( nBoundary//3 ) ]
+        planes   = []
+        for num,zpos in zip( nPlane, [ 1.0, 0.3, 0.0 ] ):
+            rr   = radius * np.sqrt( rng.random( num ) )
+            th   = 2.0*np.pi * rng.random( num )
+            planes += [ np.stack( [ rr*np.cos(th), rr*np.sin(th), np.full( num, zpos ) ], axis=1 ) ]
+        rr       = radius * np.sqrt( rng.random( nNode ) )
+        th       = 2.0*np.pi * rng.random( nNode )
+        nodes    = np.stack( [ rr*np.cos(th), rr*np.sin(th), rng.random( nNode ) ], axis=1 )
+
+    # ------------------------------------------------- #
+    # --- [3] unit cube : faces / volume            --- #
+    # ------------------------------------------------- #
+    elif ( geometry == "cube" ):
+        faces    = rng.random( (nBoundary,3) )
+        axis     = rng.integers( 0, 3, nBoundary )
+        faces[ np.arange( nBoundary ), axis ] = rng.integers( 0, 2, nBoundary )
+        order    = np.argsort( faces[:,z_] )
+        planes   = [ np.zeros( (0,3) ), faces[order], np.zeros( (0,3) ) ]
+        nodes    = rng.random( (nNode,3) )
+    else:
+        sys.exit( "[benchmark__rbf.py] unknown geometry :: {0}".format( geometry ) )
+
+    # ------------------------------------------------- #
+    # --- [4] displacement : bulge on middle set    --- #
+    # ------------------------------------------------- #
+    boundaries   = np.concatenate( planes, axis=0 )
+    displacement = np.zeros_like( boundaries )
+    iS, iE       = planes[0].shape[0], planes[0].shape[0] + planes[1].shape[0]
+    radii        = np.sqrt( boundaries[iS:iE,x_]**2 + boundaries[iS:iE,y_]**2 )
+    displacement[iS:iE,z_] = 0.15 * np.clip( 1.0 - ( radii / radius )**2, 0.0, None )
+    return( boundaries, displacement, nodes )
+
+
+# ========================================================= #
+# ===  save results ( json / csv )                      === #
+# ========================================================= #
+
+def save__results( results=None, outFile="bench.json" ):
+    if ( os.path.splitext( outFile )[1].lower() == ".csv" ):
+        keys = list( results[0].keys() )
+        with open( outFile, "w", newline="" ) as f:
+            writer = csv.DictWriter( f, fieldnames=keys )
+            writer.writeheader()
+            writer.writerows( results )
+    else:
+        with open( outFile, "w" ) as f:
+            json.dump( results, f, indent=2 )
+    print( "[benchmark__rbf] results saved in {0}".format( outFile ) )
+    return()
+
+
+# ========================================================= #
+# ===   Execution of Pragram                            === #
+# ========================================================= #
+
+if ( __name__=="__main__" ):
+    import argparse
+    parser = argparse.ArgumentParser( description="scaling benchmark of morph__rbf" )
+    parser.add_argument( "--geometry"  , nargs="+", default=[ "planes", "cube", "cylinder" ] )
+    parser.add_argument( "--boundaries", nargs="+", type=int, default=[ 100, 300, 1000, 3000 ] )
+    parser.add_argument( "--nodes"     , nargs="+", type=int, default=[ 1000, 10000, 100000 ] )
+    parser.add_argument( "--engines"   , nargs="+", default=list( engines_default.keys() ) )
+    parser.add_argument( "--sample"    , type=int , default=200 )
+    parser.add_argument( "--memory"    , type=float, default=maxMemory_default, \
+                         help="R block memory of the global engines [MB]" )
+    parser.add_argument( "--no-isolate", action="store_true" )
+    parser.add_argument( "--out"       , default="bench.json" )
+    parser.add_argument( "--msh"       , default="msh/model.msh" )
+    args   = parser.parse_args()
+    benchmark__rbf( geometries=args.geometry, nBoundaries=args.boundaries, nNodes=args.nodes, \
+                    engines={ key:dict( engines_default[key], maxMemory=args.memory ) \
+                              if ( "maxMemory" in engines_default[key] ) else engines_default[key] \
+                              for key in args.engines }, \
+                    nSample=args.sample, isolate=not( args.no_isolate ), outFile=args.out, \
+                    mshFile=args.msh )
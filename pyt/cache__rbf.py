@@ -0,0 +1,134 @@
+import os, sys, shutil, hashlib
+import numpy        as np
+import scipy.sparse as sps
+
+# ========================================================= #
+# ===  persistent on-disk cache of G factor / R matrix  === #
+# ========================================================= #
+#  -- cacheDir/<key>/  one directory per entry
+#       factor  :: key = hash( boundaries, rbfType, coef )
+#                  cholesky -> L.npy + factor.npz ( lower ),  ldl -> L.npy + factor.npz ( band, perm )
+#                  sparse   -> G.npz ( refactorized on load )
+#       R       :: key = hash( boundaries, nodes, rbfType, coef )
+#                  dense -> R.npy ( written blockwise, read back with mmap ),  sparse -> R.npz
+#  -- LRU :: directory mtime is touched on every hit, oldest entries are removed
+#            until the total size is below maxBytes.
+
+class RBFCache:
+
+    # ------------------------------------------------- #
+    # --- constructor                               --- #
+    # ------------------------------------------------- #
+    def __init__( self, cacheDir="rbf_cache", maxBytes=4*1024**3, maxRBytes=None ):
+        self.cacheDir  = cacheDir
+        self.maxBytes  = maxBytes
+        self.maxRBytes = maxBytes // 2 if ( maxRBytes is None ) else maxRBytes
+        os.makedirs( self.cacheDir, exist_ok=True )
+
+    # ------------------------------------------------- #
+    # --- hash key                                  --- #
+    # ------------------------------------------------- #
+    def make__key( self, prefix="factor", arrays=[], rbfType="gaussian", coef=1.0 ):
+        sha = hashlib.sha1()
+        sha.update( "{0}:{1}:{2!r}".format( prefix, rbfType.lower(), float( coef ) ).encode() )
+        for array in arrays:
+            array = np.ascontiguousarray( array, dtype=np.float64 )
+            sha.update( str( array.shape ).encode() )
+            sha.update( array.tobytes() )
+        return( prefix + "_" + sha.hexdigest() )
+
+    def entry( self, key=None ):
+        return( os.path.join( self.cacheDir, key ) )
+
+    def lookup( self, key=None ):
+        path = self.entry( key=key )
+        if ( os.path.isdir( path ) and os.path.exists( os.path.join( path, "done" ) ) ):
+            os.utime( path )
+            return( path )
+        return( None )
+
+    def create( self, key=None ):
+        path = self.entry( key=key )
+        if ( os.path.isdir( path ) ): shutil.rmtree( path, ignore_errors=True )
+        os.makedirs( path )
+        return( path )
+
+    def commit( self, path=None ):
+        #  -- "done" marks a complete entry ( interrupted writes are never read back )
+        open( os.path.join( path, "done" ), "w" ).close()
+        os.utime( path )
+        self.evict()
+
+    # ------------------------------------------------- #
+    # --- factor of G                               --- #
+    # ------------------------------------------------- #
+    def load__factor( self, key=None ):
+        path = self.lookup( key=key )
+        if ( path is None ): return( None )
+        with np.load( os.path.join( path, "factor.npz" ) ) as data:
+            factorType = str( data["factorType"] )
+            if   ( factorType in [ "cholesky", "cholesky32" ] ):
+                #  -- float32 factors of older versions are read back only to be rejected
+                factor = ( np.load( os.path.join( path, "L.npy" ) ), bool( data["lower"] ) )
+            elif ( factorType == "ldl" ):
+                factor = ( np.load( os.path.join( path, "L.npy" ) ), data["band"], data["perm"] )
+            else:
+                factor = sps.load_npz( os.path.join( path, "G.npz" ) )
+        return( factorType, factor )
+
+    def save__factor( self, key=None, factorType=None, factor=None ):
+        path = self.create( key=key )
+        if   ( factorType == "cholesky" ):
+            np.save ( os.path.join( path, "L.npy" ), factor[0] )
+            np.savez( os.path.join( path, "factor.npz" ), factorType=factorType, lower=factor[1] )
+        elif ( factorType == "ldl" ):
+            np.save ( os.path.join( path, "L.npy" ), factor[0] )
+            np.savez( os.path.join( path, "factor.npz" ), factorType=factorType, \
+                      band=factor[1], perm=factor[2] )
+        else:
+            #  -- sparse factors cannot be serialized :: keep G, refactorize on load
+            sps.save_npz( os.path.join( path, "G.npz" ), factor )
+            np.savez( os.path.join( path, "factor.npz" ), factorType=factorType )
+        self.commit( path=path )
+
+    # ------------------------------------------------- #
+    # --- R matrix ( memory mapped )                --- #
+    # ------------------------------------------------- #
+    def load__R( self, key=None ):
+        path = self.lookup( key=key )
+        if ( path is None ): return( None )
+        if ( os.path.exists( os.path.join( path, "R.npz" ) ) ):
+            return( sps.load_npz( os.path.join( path, "R.npz" ) ).tocsr() )
+        return( np.load( os.path.join( path, "R.npy" ), mmap_mode="r" ) )
+
+    def open__R( self, key=None, shape=None, dtype=np.float64 ):
+        #  -- returns ( path, writable memmap ) or None if R does not fit the budget
+        if ( np.dtype( dtype ).itemsize*shape[0]*shape[1] > self.maxRBytes ): return( None )
+        path = self.create( key=key )
+        Rmap = np.lib.format.open_memmap( os.path.join( path, "R.npy" ), mode="w+", \
+                                          dtype=dtype, shape=shape )
+        return( path, Rmap )
+
+    def save__sparseR( self, key=None, Rmat=None ):
+        nbytes = Rmat.data.nbytes + Rmat.indices.nbytes + Rmat.indptr.nbytes
+        if ( nbytes > self.maxRBytes ): return()
+        path = self.create( key=key )
+        sps.save_npz( os.path.join( path, "R.npz" ), Rmat )
+        self.commit( path=path )
+
+    # ------------------------------------------------- #
+    # --- size based LRU eviction                   --- #
+    # ------------------------------------------------- #
+    def evict( self ):
+        entries = []
+        for name in os.listdir( self.cacheDir ):
+            path  = self.entry( key=name )
+            if ( not( os.path.isdir( path ) ) ): continue
+            size  = sum( os.path.getsize( os.path.join( path, f ) ) for f in os.listdir( path ) )
+            entries += [ ( os.path.getmtime( path ), size, path ) ]
+        total   = sum( entry[1] for entry in entries )
+        for mtime,size,path in sorted( entries ):
+            if ( total <= self.maxBytes ): break
+            shutil.rmtree( path, ignore_errors=True )
+            total -= size
+        return()
@@ -0,0 +1,65 @@
+import os, sys
+import numpy as np
+
+# ========================================================= #
+# ===  tetra quality ( signed volume, jacobian, aspect ) === #
+# ========================================================= #
+#  -- one numpy sweep over all tetra ::
+#       volume    :: signed volume,  det[ p1-p0, p2-p0, p3-p0 ] / 6
+#       jacobian  :: scaled jacobian, min over 4 corners of det / ( |e1||e2||e3| ) * sqrt(2)
+#                    ( = 1 for regular tetra, <= 0 for inverted / flat tetra )
+#       aspect    :: longest edge / ( 2 sqrt(6) * inradius )  ( = 1 for regular tetra )
+#  -- orientation :: sign of reference volumes, inverted = sign flipped against it
+
+def check__meshQuality( points=None, cells=None, orientation=None, bins=None ):
+
+    # ------------------------------------------------- #
+    # --- [1] Arguments                             --- #
+    # ------------------------------------------------- #
+    if ( points is None ): sys.exit( "[check__meshQuality.py] points == ???" )
+    if ( cells  is None ): sys.exit( "[check__meshQuality.py] cells  == ???" )
+    if ( bins   is None ): bins = np.linspace( -1.0, 1.0, 21 )
+
+    # ------------------------------------------------- #
+    # --- [2] edges & signed volume                 --- #
+    # ------------------------------------------------- #
+    p0, p1, p2, p3 = [ points[cells[:,ik]] for ik in range(4) ]
+    e01, e02, e03  = p1-p0, p2-p0, p3-p0
+    e12, e13, e23  = p2-p1, p3-p1, p3-p2
+    det            = np.einsum( "ij,ij->i", e01, np.cross( e02, e03 ) )
+    volume         = det / 6.0
+    if ( orientation is None ): orientation = np.where( volume < 0.0, -1.0, 1.0 )
+    sdet           = det * orientation
+
+    # ------------------------------------------------- #
+    # --- [3] scaled jacobian at 4 corners          --- #
+    # ------------------------------------------------- #
+    length         = { key:np.linalg.norm( vec, axis=1 ) for key,vec in \
+                       [ ( "01",e01 ), ( "02",e02 ), ( "03",e03 ), \
+                         ( "12",e12 ), ( "13",e13 ), ( "23",e23 ) ] }
+    corners        = np.stack( [ length["01"]*length["02"]*length["03"], \
+                                 length["01"]*length["12"]*length["13"], \
+                                 length["02"]*length["12"]*length["23"], \
+                                 length["03"]*length["13"]*length["23"] ], axis=1 )
+    jacobian       = np.sqrt( 2.0 ) * sdet / np.maximum( np.max( corners, axis=1 ), 1.e-300 )
+
+    # ------------------------------------------------- #
+    # --- [4] aspect ratio                          --- #
+    # ------------------------------------------------- #
+    area           = 0.5 * ( np.linalg.norm( np.cross( e01, e02 ), axis=1 ) + \
+                             np.linalg.norm( np.cross( e01, e03 ), axis=1 ) + \
+                             np.linalg.norm( np.cross( e02, e03 ), axis=1 ) + \
+                             np.linalg.norm( np.cross( e12, e13 ), axis=1 ) )
+    inradius       = 3.0 * np.abs( volume ) / np.maximum( area, 1.e-300 )
+    longest        = np.max( np.stack( list( length.values() ), axis=1 ), axis=1 )
+    aspect         = longest / np.maximum( 2.0*np.sqrt( 6.0 )*inradius, 1.e-300 )
+
+    # ------------------------------------------------- #
+    # --- [5] summary                               --- #
+    # ------------------------------------------------- #
+    histogram, edges = np.histogram( np.clip( jacobian, bins[0], bins[-1] ), bins=bins )
+    ret = { "volume":volume, "jacobian":jacobian, "aspect":aspect, "orientation":orientation, \
+            "nInverted":int( np.sum( sdet <= 0.0 ) ), \
+            "minJacobian":float( np.min( jacobian ) ), "maxAspect":float( np.max( aspect ) ), \
+            "histogram":histogram, "bins":edges }
+    return( ret )
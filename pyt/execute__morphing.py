@@ -1,5 +1,5 @@
 import numpy                       as np
-import nkMeshRoutines.load__meshio as mio
+import load__mshFile               as lms
 
 # ========================================================= #
 # ===  execute__morphing.py                             === #
@@ -14,14 +14,19 @@ def execute__morphing():
     # --- [1] load msh File                         --- #
     # ------------------------------------------------- #
     mshFile        = "msh/model.msh"
-    cells, points  = mio.load__meshio( mshFile=mshFile, returnType="elem-node", \
-                                       elementType="tetra" )
-    physnums       = mio.load__meshio( mshFile=mshFile, returnType="physnums", \
-                                       elementType="tetra" )
+    mesh           = lms.load__mshFile( mshFile=mshFile )
+    cells, points  = mesh["cells"], mesh["points"]
+    physnums       = mesh["physnums"]
     
-    index_top      = np.where( points[:,z_] == 1.0 )
-    index_mid      = np.where( points[:,z_] == 0.3 )
-    index_bot      = np.where( points[:,z_] == 0.0 )
+    # ------------------------------------------------- #
+    # --- [2] boundary nodes from tetra topology    --- #
+    # ------------------------------------------------- #
+    import extract__boundaryFaces as ebf
+    boundary       = ebf.extract__boundaryFaces( cells=cells, physnums=physnums, points=points, \
+                                                 featureAngle=30.0, mshFile=mshFile )
+    index_top      = ebf.find__patchByNormal( boundary=boundary, normal=[0.0,0.0,+1.0] )
+    index_mid      = boundary["interface_301_302"]
+    index_bot      = ebf.find__patchByNormal( boundary=boundary, normal=[0.0,0.0,-1.0] )
     boundaries_top = points[ index_top ]
     boundaries_mid = points[ index_mid ]
     boundaries_bot = points[ index_bot ]
@@ -37,10 +42,13 @@ def execute__morphing():
     displace_bot   = np.zeros_like( boundaries_bot )
     displacement   = np.concatenate( [displace_top,displace_mid,displace_bot],axis=0 )
     
-    import nkMeshRoutines.morph__rbf as mph
-    updatept       = mph.morph__rbf( displacement=displacement, boundaries=boundaries, \
-                                     nodes=points, coef=0.1 )
-    import nkMeshRoutines.save__nastranFile as snf
+    # ------------------------------------------------- #
+    # --- [3] morph ( quality checked, subdivided ) --- #
+    # ------------------------------------------------- #
+    import morph__stepwise as mst
+    updatept, info = mst.morph__stepwise( displacement=displacement, boundaries=boundaries, \
+                                          nodes=points, cells=cells, coef=0.1 )
+    import save__nastranFile as snf
     snf.save__nastranFile( points=updatept, cells=cells, outFile="out.bdf", matNums=physnums )
 
     return()
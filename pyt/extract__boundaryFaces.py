@@ -0,0 +1,168 @@
+import os, sys, hashlib
+import numpy                 as np
+import scipy.sparse          as sps
+import scipy.sparse.csgraph  as csg
+
+# ========================================================= #
+# ===  extract boundary node sets from tetra topology   === #
+# ========================================================= #
+#  -- faces of all tetra are sorted & matched ( O(n log n) ) ::
+#       appears once                        -> exterior face of its region
+#       appears twice, different physnums   -> interface face between the two regions
+#  -- returns dict of node index arrays ::
+#       "exterior_<phys>", "interface_<phys1>_<phys2>",
+#       "patch_<k>"   ( exterior faces split at featureAngle, needs points ),
+#       "surface_<entity>" ( surface triangles of the msh file, if given ),
+#       "patchNormals" (K,3) mean outward normal of each patch
+
+def extract__boundaryFaces( cells=None, physnums=None, points=None, featureAngle=None, \
+                            faces=None, faceEntities=None, mshFile=None ):
+
+    # ------------------------------------------------- #
+    # --- [1] Arguments                             --- #
+    # ------------------------------------------------- #
+    if ( cells    is None ): sys.exit( "[extract__boundaryFaces.py] cells == ???" )
+    if ( physnums is None ): physnums = np.zeros( (cells.shape[0],), dtype=np.int64 )
+    if ( ( featureAngle is not None ) and ( points is None ) ):
+        sys.exit( "[extract__boundaryFaces.py] featureAngle requires points" )
+
+    # ------------------------------------------------- #
+    # --- [2] cache alongside the mesh              --- #
+    # ------------------------------------------------- #
+    if ( mshFile is not None ):
+        cacheFile = os.path.splitext( mshFile )[0] + ".boundary.cache.npz"
+        #  -- stamp :: msh file ( mtime, size ), featureAngle & hash of the given arrays
+        digest    = hash__arrays( arrays=[ cells, physnums, points, faces, faceEntities ] )
+        stamp     = np.array( [ os.stat( mshFile ).st_mtime_ns, os.stat( mshFile ).st_size, \
+                                -1 if ( featureAngle is None ) else int( 1.e6*featureAngle ) ] \
+                              + digest, dtype=np.int64 )
+        if ( os.path.exists( cacheFile ) ):
+            with np.load( cacheFile ) as cache:
+                if ( ( "stamp" in cache ) and np.array_equal( cache["stamp"], stamp ) ):
+                    return( { key:cache[key] for key in cache.files if ( key != "stamp" ) } )
+
+    # ------------------------------------------------- #
+    # --- [3] match face triples                    --- #
+    # ------------------------------------------------- #
+    local    = np.array( [ [0,1,2], [0,1,3], [0,2,3], [1,2,3] ] )
+    opposite = np.array( [ 3, 2, 1, 0 ] )
+    tface    = cells[:,local].reshape( -1,3 )
+    owner    = np.repeat( np.arange( cells.shape[0] ), 4 )
+    apex     = cells[:,opposite].reshape( -1 )
+    skey     = np.sort( tface, axis=1 )
+    order    = np.lexsort( ( skey[:,2], skey[:,1], skey[:,0] ) )
+    skey     = skey[order]
+    same     = np.all( skey[1:] == skey[:-1], axis=1 )
+    prevSame = np.concatenate( [ [False], same  ] )
+    nextSame = np.concatenate( [ same , [False] ] )
+    single   = order[ ~( prevSame | nextSame ) ]
+    pairA    = order[:-1][same]
+    pairB    = order[ 1:][same]
+
+    # ------------------------------------------------- #
+    # --- [4] exterior / interface node sets        --- #
+    # ------------------------------------------------- #
+    ret      = {}
+    extPhys  = physnums[ owner[single] ]
+    for phys in np.unique( extPhys ):
+        ret[ "exterior_{0}".format( phys ) ] = np.unique( tface[ single[ extPhys == phys ] ] )
+    physA    = physnums[ owner[pairA] ]
+    physB    = physnums[ owner[pairB] ]
+    cross    = ( physA != physB )
+    lowP     = np.minimum( physA[cross], physB[cross] )
+    highP    = np.maximum( physA[cross], physB[cross] )
+    crossF   = pairA[cross]
+    for pair in np.unique( np.stack( [ lowP, highP ], axis=1 ), axis=0 ):
+        hit  = ( lowP == pair[0] ) & ( highP == pair[1] )
+        ret[ "interface_{0}_{1}".format( pair[0], pair[1] ) ] = np.unique( tface[ crossF[hit] ] )
+
+    # ------------------------------------------------- #
+    # --- [5] surface entities from the msh file    --- #
+    # ------------------------------------------------- #
+    if ( ( faces is not None ) and ( faceEntities is not None ) ):
+        for tag in np.unique( faceEntities ):
+            ret[ "surface_{0}".format( tag ) ] = np.unique( faces[ faceEntities == tag ] )
+
+    # ------------------------------------------------- #
+    # --- [6] smooth patches of exterior faces      --- #
+    # ------------------------------------------------- #
+    if ( featureAngle is not None ):
+        labels, normals = split__patches( tface=tface[single], apex=apex[single], \
+                                          points=points, featureAngle=featureAngle )
+        for ik in range( normals.shape[0] ):
+            ret[ "patch_{0}".format( ik ) ] = np.unique( tface[ single[ labels == ik ] ] )
+        ret["patchNormals"] = normals
+
+    if ( mshFile is not None ):
+        np.savez( cacheFile, stamp=stamp, **ret )
+    return( ret )
+
+
+def hash__arrays( arrays=[] ):
+    #  -- sha1 of dtype, shape & content ( None counts as absent ), as two int64 words
+    sha = hashlib.sha1()
+    for array in arrays:
+        if ( array is None ):
+            sha.update( b"None;" )
+            continue
+        array = np.ascontiguousarray( array )
+        sha.update( "{0}{1};".format( array.dtype.str, array.shape ).encode() )
+        sha.update( array.tobytes() )
+    return( np.frombuffer( sha.digest()[:16], dtype=np.int64 ).tolist() )
+
+
+# ========================================================= #
+# ===  split exterior faces at sharp edges              === #
+# ========================================================= #
+
+def split__patches( tface=None, apex=None, points=None, featureAngle=30.0 ):
+
+    # ------------------------------------------------- #
+    # --- [1] outward unit normals                  --- #
+    # ------------------------------------------------- #
+    pA, pB, pC = points[tface[:,0]], points[tface[:,1]], points[tface[:,2]]
+    normal     = np.cross( pB-pA, pC-pA )
+    inward     = np.sum( normal * ( points[apex]-pA ), axis=1 ) > 0.0
+    normal[inward] *= -1.0
+    area       = np.linalg.norm( normal, axis=1 )
+    normal     = normal / np.maximum( area, 1.e-300 )[:,None]
+
+    # ------------------------------------------------- #
+    # --- [2] faces sharing an edge, smooth enough  --- #
+    # ------------------------------------------------- #
+    nFace      = tface.shape[0]
+    edges      = np.sort( tface[:,[[0,1],[1,2],[0,2]]].reshape(-1,2), axis=1 )
+    eface      = np.repeat( np.arange( nFace ), 3 )
+    order      = np.lexsort( ( edges[:,1], edges[:,0] ) )
+    edges      = edges[order]
+    eface      = eface[order]
+    same       = np.all( edges[1:] == edges[:-1], axis=1 )
+    fA, fB     = eface[:-1][same], eface[1:][same]
+    smooth     = np.sum( normal[fA]*normal[fB], axis=1 ) >= np.cos( np.radians( featureAngle ) )
+    graph      = sps.coo_matrix( ( np.ones( int( np.sum( smooth ) ) ), \
+                                   ( fA[smooth], fB[smooth] ) ), shape=(nFace,nFace) )
+    nPatch, labels = csg.connected_components( graph, directed=False )
+
+    # ------------------------------------------------- #
+    # --- [3] area weighted mean normal per patch   --- #
+    # ------------------------------------------------- #
+    normals    = np.zeros( (nPatch,3) )
+    np.add.at( normals, labels, normal*area[:,None] )
+    normals   /= np.maximum( np.linalg.norm( normals, axis=1 ), 1.e-300 )[:,None]
+    return( labels, normals )
+
+
+# ========================================================= #
+# ===  node set of patches facing a direction           === #
+# ========================================================= #
+
+def find__patchByNormal( boundary=None, normal=None, angle=10.0 ):
+    if ( boundary is None ): sys.exit( "[find__patchByNormal] boundary == ???" )
+    if ( normal   is None ): sys.exit( "[find__patchByNormal] normal   == ???" )
+    if ( not( "patchNormals" in boundary ) ):
+        sys.exit( "[find__patchByNormal] call extract__boundaryFaces with featureAngle" )
+    normal  = np.asarray( normal, dtype=np.float64 ) / np.linalg.norm( normal )
+    cosines = boundary["patchNormals"] @ normal
+    hits    = np.nonzero( cosines >= np.cos( np.radians( angle ) ) )[0]
+    if ( hits.size == 0 ): return( np.zeros( (0,), dtype=np.int64 ) )
+    return( np.unique( np.concatenate( [ boundary["patch_{0}".format( ik )] for ik in hits ] ) ) )
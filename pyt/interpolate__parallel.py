@@ -0,0 +1,106 @@
+import os, sys
+import numpy                   as np
+import multiprocessing         as mp
+import multiprocessing.shared_memory as shm
+import morph__rbf              as mph
+
+# ========================================================= #
+# ===  parallel interpolation  ( process pool )         === #
+# ========================================================= #
+#  -- nodes / boundaries / alphas / results live in shared memory,
+#     each worker evaluates its chunk of nodes and writes the result in place.
+
+def interpolate__parallel( nodes=None, boundaries=None, alphas=None, rbfType="gaussian", \
+                           coef=1.0, nWorkers=None, blockSize=None, maxMemory=None, \
+                           displacementOnly=False, dtype=np.float64, radius=None ):
+
+    # ------------------------------------------------- #
+    # --- [1] Arguments                             --- #
+    # ------------------------------------------------- #
+    if ( nodes      is None ): raise ValueError( "[interpolate__parallel.py] nodes      == ???" )
+    if ( boundaries is None ): raise ValueError( "[interpolate__parallel.py] boundaries == ???" )
+    if ( alphas     is None ): raise ValueError( "[interpolate__parallel.py] alphas     == ???" )
+    if ( nWorkers   is None ): nWorkers = os.cpu_count()
+    nNodes   = nodes.shape[0]
+    nWorkers = int( max( 1, min( nWorkers, nNodes ) ) )
+    
+    # ------------------------------------------------- #
+    # --- [2] shared memory buffers                 --- #
+    # ------------------------------------------------- #
+    arrays   = { "nodes"     :np.asarray( nodes     , dtype=np.float64 ), \
+                 "boundaries":np.asarray( boundaries, dtype=np.float64 ), \
+                 "alphas"    :np.asarray( alphas    , dtype=np.float64 ), \
+                 "results"   :np.zeros( (nNodes,np.shape( alphas )[1]) ) if ( displacementOnly ) \
+                              else np.asarray( nodes, dtype=np.float64 ) }
+    buffers  = {}
+    specs    = {}
+    try:
+        for key,array in arrays.items():
+            buffers[key] = shm.SharedMemory( create=True, size=max( 1, array.nbytes ) )
+            view         = np.ndarray( array.shape, dtype=np.float64, buffer=buffers[key].buf )
+            view[...]    = array
+            specs[key]   = ( buffers[key].name, array.shape )
+            
+        # ------------------------------------------------- #
+        # --- [3] chunks & pool                         --- #
+        # ------------------------------------------------- #
+        #  -- a few chunks per worker for load balance; blocks inside a chunk bound memory
+        nChunk   = int( np.ceil( nNodes / ( 4*nWorkers ) ) )
+        chunks   = [ ( iS, min( iS+nChunk, nNodes ) ) for iS in range( 0, nNodes, nChunk ) ]
+        settings = { "rbfType":rbfType, "coef":coef, "blockSize":blockSize, \
+                     "maxMemory":maxMemory, "displacementOnly":displacementOnly, "dtype":dtype, \
+                     "radius":radius }
+        with mp.Pool( processes=nWorkers, initializer=initialize__worker, \
+                      initargs=( specs, settings ) ) as pool:
+            pool.map( evaluate__chunk, chunks )
+        results  = np.ndarray( arrays["results"].shape, dtype=np.float64, \
+                               buffer=buffers["results"].buf ).copy()
+    finally:
+        for key,buff in buffers.items():
+            buff.close()
+            buff.unlink()
+    return( results )
+
+
+# ========================================================= #
+# ===  worker side                                      === #
+# ========================================================= #
+
+_worker = {}
+
+def initialize__worker( specs=None, settings=None ):
+    #  -- attach once per process ( nothing is pickled per chunk )
+    for key,( name, shape ) in specs.items():
+        buff                       = shm.SharedMemory( name=name )
+        _worker["shm_"+key]        = buff
+        _worker[key]               = np.ndarray( shape, dtype=np.float64, buffer=buff.buf )
+    _worker.update( settings )
+    _worker["rbf_func"] = mph.get__rbfFunction( rbfType=settings["rbfType"] )
+    _worker["phi_func"] = mph.get__rbfKernel  ( rbfType=settings["rbfType"] )
+    _worker["compact"]  = mph.is__compactKernel( rbfType=settings["rbfType"] )
+    if ( _worker["compact"] and ( _worker["radius"] is None ) ):
+        _worker["radius"] = _worker["coef"]
+    if ( _worker["radius"] is not None ):
+        _worker["tree"] = mph.cKDTree( _worker["boundaries"] )
+
+
+def evaluate__chunk( chunk=None ):
+    iS, iE = chunk
+    if ( _worker["radius"] is not None ):
+        ret = mph.interpolate__sparse( nodes=_worker["nodes"][iS:iE], tree=_worker["tree"], \
+                                       alphas=_worker["alphas"], phi_func=_worker["phi_func"], \
+                                       coef=_worker["coef"], radius=_worker["radius"], \
+                                       blockSize=_worker["blockSize"], \
+                                       maxMemory=_worker["maxMemory"], \
+                                       displacementOnly=_worker["displacementOnly"], \
+                                       dtype=_worker["dtype"] )
+    else:
+        ret = mph.interpolate__rbf( nodes=_worker["nodes"][iS:iE], \
+                                    boundaries=_worker["boundaries"], \
+                                    alphas=_worker["alphas"], rbf_func=_worker["rbf_func"], \
+                                    coef=_worker["coef"], blockSize=_worker["blockSize"], \
+                                    maxMemory=_worker["maxMemory"], \
+                                    displacementOnly=_worker["displacementOnly"], \
+                                    dtype=_worker["dtype"] )
+    _worker["results"][iS:iE,:] = ret
+    return( iE-iS )
@@ -0,0 +1,242 @@
+import os, sys
+import numpy as np
+
+# ========================================================= #
+# ===  load gmsh MSH 4.1 file ( ascii / binary )        === #
+# ========================================================= #
+#  -- one pass over $Entities / $Nodes / $Elements, blocks are parsed in bulk with numpy.
+#  -- returns dict ::
+#       points      (N,3)  float64     nodeTags     (N)    gmsh node tags
+#       cells       (E,4)  tetra ( 0-based index into points )
+#       physnums    (E)    physical tag of each tetra  ( 0 if none )
+#       entities    (E)    volume entity tag of each tetra
+#       faces       (F,3)  triangles on surface entities ( 0-based )
+#       faceEntities(F)    surface entity tag        facePhysnums (F)  physical tag
+
+nodesPerElement = { 1:2, 2:3, 3:4, 4:4, 5:8, 6:6, 7:5, 8:3, 9:6, 10:9, 11:10, 15:1 }
+tetraType, triangleType = 4, 2
+
+def load__mshFile( mshFile=None, useCache=True ):
+
+    # ------------------------------------------------- #
+    # --- [1] Arguments                             --- #
+    # ------------------------------------------------- #
+    if ( mshFile is None ): sys.exit( "[load__mshFile.py] mshFile == ???" )
+    if ( not( os.path.exists( mshFile ) ) ):
+        sys.exit( "[load__mshFile.py] cannot find mshFile :: {0}".format( mshFile ) )
+
+    # ------------------------------------------------- #
+    # --- [2] cache ( keyed by mtime & size )       --- #
+    # ------------------------------------------------- #
+    cacheFile = os.path.splitext( mshFile )[0] + ".cache.npz"
+    stamp     = np.array( [ os.stat( mshFile ).st_mtime_ns, os.stat( mshFile ).st_size ], \
+                          dtype=np.int64 )
+    if ( useCache and os.path.exists( cacheFile ) ):
+        with np.load( cacheFile ) as cache:
+            if ( ( "stamp" in cache ) and np.array_equal( cache["stamp"], stamp ) ):
+                return( { key:cache[key] for key in cache.files if ( key != "stamp" ) } )
+
+    # ------------------------------------------------- #
+    # --- [3] read & dispatch ascii / binary        --- #
+    # ------------------------------------------------- #
+    with open( mshFile, "rb" ) as f:
+        data = f.read()
+    header   = data[ data.index( b"$MeshFormat" ):data.index( b"$EndMeshFormat" ) ].split()
+    version, fileType, dataSize = header[1].decode(), int( header[2] ), int( header[3] )
+    if ( not( version.startswith( "4" ) ) ):
+        sys.exit( "[load__mshFile.py] only MSH 4.x is supported :: {0}".format( version ) )
+    if ( fileType == 0 ):
+        entities, nodes, elements = read__ascii ( data=data )
+    else:
+        entities, nodes, elements = read__binary( data=data, dataSize=dataSize )
+
+    # ------------------------------------------------- #
+    # --- [4] tags -> indices, physical numbers     --- #
+    # ------------------------------------------------- #
+    nodeTags, points = nodes
+    lookup           = np.full( int( nodeTags.max() )+1, -1, dtype=np.int64 )
+    lookup[nodeTags] = np.arange( nodeTags.shape[0] )
+    mesh             = { "points":points, "nodeTags":nodeTags }
+    for elemType,dim,keys in [ ( tetraType   , 3, ( "cells", "entities"    , "physnums"     ) ), \
+                               ( triangleType, 2, ( "faces", "faceEntities", "facePhysnums" ) ) ]:
+        blocks    = [ blk for blk in elements if ( blk[1] == elemType ) ]
+        if ( len( blocks ) == 0 ):
+            conn  = np.zeros( (0,nodesPerElement[elemType]), dtype=np.int64 )
+            tags  = np.zeros( (0,), dtype=np.int64 )
+        else:
+            conn  = np.concatenate( [ blk[2] for blk in blocks ], axis=0 )
+            tags  = np.concatenate( [ np.full( blk[2].shape[0], blk[0], dtype=np.int64 ) \
+                                      for blk in blocks ] )
+        mesh[keys[0]] = lookup[conn]
+        mesh[keys[1]] = tags
+        mesh[keys[2]] = map__physnums( tags=tags, entities=entities, dim=dim )
+
+    # ------------------------------------------------- #
+    # --- [5] save cache                            --- #
+    # ------------------------------------------------- #
+    if ( useCache ):
+        try:
+            np.savez( cacheFile, stamp=stamp, **mesh )
+        except OSError:
+            print( "[load__mshFile.py] cannot write cache :: {0}".format( cacheFile ) )
+    return( mesh )
+
+
+# ========================================================= #
+# ===  entity tag -> physical number  ( vectorized )    === #
+# ========================================================= #
+
+def map__physnums( tags=None, entities=None, dim=3 ):
+    keys   = [ key[1] for key in entities.keys() if ( key[0] == dim ) ]
+    if ( ( len( keys ) == 0 ) or ( tags.size == 0 ) ): return( np.zeros_like( tags ) )
+    table  = np.zeros( max( max( keys ), int( tags.max() ) )+1, dtype=np.int64 )
+    for key in keys: table[key] = entities[(dim,key)]
+    return( table[tags] )
+
+
+# ========================================================= #
+# ===  ascii  MSH 4.1                                   === #
+# ========================================================= #
+
+def read__ascii( data=None ):
+
+    def section( name ):
+        #  -- bytes between the "$Name" header line and "$EndName" ( None if absent )
+        iS = data.find( b"$" + name )
+        if ( iS < 0 ): return( None )
+        iS = data.index( b"\n", iS ) + 1
+        return( data[ iS:data.index( b"$End" + name, iS ) ] )
+
+    # ------------------------------------------------- #
+    # --- [1] $Entities :: physical tag per entity  --- #
+    # ------------------------------------------------- #
+    entities = {}
+    text     = section( b"Entities" )
+    if ( text is not None ):
+        lines   = text.decode().splitlines()
+        nEntity = [ int( val ) for val in lines[0].split() ]
+        iL      = 1
+        for dim in range( 4 ):
+            for ik in range( nEntity[dim] ):
+                words  = lines[iL].split()
+                iP     = 4 if ( dim == 0 ) else 7
+                nPhys  = int( words[iP] )
+                if ( nPhys > 0 ): entities[(dim,int(words[0]))] = abs( int( words[iP+1] ) )
+                iL    += 1
+
+    # ------------------------------------------------- #
+    # --- [2] $Nodes  ( one numeric array )         --- #
+    # ------------------------------------------------- #
+    #  -- the whole section is parsed at once ( tags < 2^53 are exact in float64 ),
+    #     block headers are walked by offset :: python work is O( nBlocks )
+    values   = np.fromstring( section( b"Nodes" ), dtype=np.float64, sep=" " )
+    nBlocks  = int( values[0] )
+    iV       = 4
+    tagsList, coordList = [], []
+    for ib in range( nBlocks ):
+        dim, tag, param, num = [ int( val ) for val in values[iV:iV+4] ]
+        width    = 3 + ( dim if param else 0 )
+        iV      += 4
+        tagsList.append ( values[iV:iV+num] )
+        coordList.append( values[iV+num:iV+num+num*width].reshape( num, width )[:,0:3] )
+        iV      += num + num*width
+    nodeTags = np.concatenate( tagsList , axis=0 ).astype( np.int64 )
+    points   = np.concatenate( coordList, axis=0 )
+
+    # ------------------------------------------------- #
+    # --- [3] $Elements  ( one integer array )      --- #
+    # ------------------------------------------------- #
+    values   = np.fromstring( section( b"Elements" ), dtype=np.int64, sep=" " )
+    nBlocks  = int( values[0] )
+    iV       = 4
+    elements = []
+    for ib in range( nBlocks ):
+        dim, tag, elemType, num = [ int( val ) for val in values[iV:iV+4] ]
+        nNode    = nodesPerElement[elemType]
+        iV      += 4
+        if ( elemType in [ tetraType, triangleType ] ):
+            conn = values[iV:iV+num*( 1+nNode )].reshape( num, 1+nNode )[:,1:]
+            elements.append( ( tag, elemType, conn ) )
+        iV      += num*( 1+nNode )
+    return( entities, ( nodeTags, points ), elements )
+
+
+# ========================================================= #
+# ===  binary MSH 4.1                                   === #
+# ========================================================= #
+
+def read__binary( data=None, dataSize=8 ):
+
+    size_t = np.dtype( "<u{0}".format( dataSize ) )
+    int_t  = np.dtype( "<i4" )
+    dble_t = np.dtype( "<f8" )
+
+    def read( dtype, count, pos ):
+        arr = np.frombuffer( data, dtype=dtype, count=count, offset=pos )
+        return( arr, pos + arr.nbytes )
+
+    def start( name ):
+        #  -- data begins after the "$Name\n" header line
+        return( data.index( name ) + len( name ) + 1 )
+
+    # ------------------------------------------------- #
+    # --- [1] $Entities                             --- #
+    # ------------------------------------------------- #
+    entities = {}
+    if ( b"$Entities\n" in data ):
+        pos          = start( b"$Entities" )
+        nEntity, pos = read( size_t, 4, pos )
+        for dim in range( 4 ):
+            for ik in range( int( nEntity[dim] ) ):
+                tag,   pos = read( int_t , 1, pos )
+                box,   pos = read( dble_t, 3 if ( dim == 0 ) else 6, pos )
+                nPhys, pos = read( size_t, 1, pos )
+                phys,  pos = read( int_t , int( nPhys[0] ), pos )
+                if ( phys.size > 0 ): entities[(dim,int(tag[0]))] = abs( int( phys[0] ) )
+                if ( dim > 0 ):
+                    nBound, pos = read( size_t, 1, pos )
+                    bound,  pos = read( int_t , int( nBound[0] ), pos )
+
+    # ------------------------------------------------- #
+    # --- [2] $Nodes                                --- #
+    # ------------------------------------------------- #
+    pos          = start( b"$Nodes" )
+    header, pos  = read( size_t, 4, pos )
+    tagsList, coordList = [], []
+    for ib in range( int( header[0] ) ):
+        info, pos  = read( int_t , 3, pos )
+        num,  pos  = read( size_t, 1, pos )
+        dim, param, num = int( info[0] ), int( info[2] ), int( num[0] )
+        width      = 3 + ( dim if param else 0 )
+        tags,   pos = read( size_t, num, pos )
+        coord,  pos = read( dble_t, num*width, pos )
+        tagsList.append ( tags.astype( np.int64 ) )
+        coordList.append( coord.reshape( num, width )[:,0:3] )
+    nodeTags = np.concatenate( tagsList , axis=0 )
+    points   = np.concatenate( coordList, axis=0 ).copy()
+
+    # ------------------------------------------------- #
+    # --- [3] $Elements                             --- #
+    # ------------------------------------------------- #
+    pos          = start( b"$Elements" )
+    header, pos  = read( size_t, 4, pos )
+    elements     = []
+    for ib in range( int( header[0] ) ):
+        info, pos  = read( int_t , 3, pos )
+        num,  pos  = read( size_t, 1, pos )
+        tag, elemType, num = int( info[1] ), int( info[2] ), int( num[0] )
+        nNode      = nodesPerElement[elemType]
+        conn, pos  = read( size_t, num*( 1+nNode ), pos )
+        if ( elemType in [ tetraType, triangleType ] ):
+            elements.append( ( tag, elemType, conn.reshape( num, 1+nNode )[:,1:].astype( np.int64 ) ) )
+    return( entities, ( nodeTags, points ), elements )
+
+
+# ========================================================= #
+# ===   Execution of Pragram                            === #
+# ========================================================= #
+
+if ( __name__=="__main__" ):
+    mesh = load__mshFile( mshFile="msh/model.msh" )
+    for key,val in mesh.items():
+        print( "{0:>14} :: {1}".format( key, val.shape ) )
@@ -0,0 +1,143 @@
+import os, sys, time
+import numpy         as np
+import scipy.sparse  as sps
+from   scipy.spatial import cKDTree
+import morph__rbf    as mph
+
+# ========================================================= #
+# ===  time-stepped incremental morphing                === #
+# ========================================================= #
+#  -- fixed boundary set, displacement given per time step ( total, w.r.t. the reference ).
+#  -- G is factorized once;  each step solves G @ alpha = d  ( cg :: warm start from last alpha )
+#     and applies only  dalpha = alpha - applied  :: current += R( reference ) @ dalpha.
+#  -- skipTolerance :: smallest |dalpha_j| are kept pending while their sum stays below
+#                      skipTolerance, so | current - exact | <= skipTolerance ( |phi| <= 1 ).
+#  -- with a cutoff radius ( compact kernel / cutoffTolerance ) only nodes within the radius
+#     of an active centre are touched.
+
+class IncrementalMorpher:
+
+    # ------------------------------------------------- #
+    # --- constructor : factorize once              --- #
+    # ------------------------------------------------- #
+    def __init__( self, boundaries=None, nodes=None, rbfType="gaussian", coef=1.0, \
+                  solver="direct", cutoffTolerance=None, skipTolerance=0.0, \
+                  blockSize=None, maxMemory=None, precision="double", silent=True, **kwargs ):
+        if ( boundaries is None ): sys.exit( "[IncrementalMorpher] boundaries == ???" )
+        if ( nodes      is None ): sys.exit( "[IncrementalMorpher] nodes      == ???" )
+        time1            = time.perf_counter()
+        self.morpher     = mph.RBFMorpher( boundaries=boundaries, rbfType=rbfType, coef=coef, \
+                                           blockSize=blockSize, maxMemory=maxMemory, \
+                                           solver=solver, precision=precision, \
+                                           cutoffTolerance=cutoffTolerance, **kwargs )
+        self.reference   = np.array( nodes, dtype=np.float64, copy=True )
+        self.current     = self.reference.copy()
+        self.skipTolerance = skipTolerance
+        self.silent      = silent
+        self.applied     = np.zeros_like( self.morpher.boundaries )
+        self.nodeTree    = None
+        if ( self.morpher.radius is not None ):
+            self.nodeTree = cKDTree( self.reference )
+        self.nStep       = 0
+        self.reports     = []
+        self.time_setup  = time.perf_counter() - time1
+
+    # ------------------------------------------------- #
+    # --- step : new boundary displacement          --- #
+    # ------------------------------------------------- #
+    def step( self, displacement=None ):
+        if ( displacement is None ): sys.exit( "[IncrementalMorpher.step] displacement == ???" )
+        time1    = time.perf_counter()
+
+        # ------------------------------------------------- #
+        # --- [1] solve ( warm start from last alphas ) --- #
+        # ------------------------------------------------- #
+        self.morpher.fit( displacement=displacement )
+        time2    = time.perf_counter()
+
+        # ------------------------------------------------- #
+        # --- [2] active centres                        --- #
+        # ------------------------------------------------- #
+        dalpha   = self.morpher.alphas - self.applied
+        weight   = np.sum( np.abs( dalpha ), axis=1 )
+        order    = np.argsort( weight )
+        pending  = np.zeros( weight.shape, dtype=bool )
+        pending[order] = ( np.cumsum( weight[order] ) <= self.skipTolerance )
+        active   = np.nonzero( ~pending & ( weight > 0.0 ) )[0]
+
+        # ------------------------------------------------- #
+        # --- [3] update touched nodes only             --- #
+        # ------------------------------------------------- #
+        nUpdated = self.update( active=active, dalpha=dalpha[active] )
+        self.applied[active] = self.morpher.alphas[active]
+        time3    = time.perf_counter()
+
+        # ------------------------------------------------- #
+        # --- [4] report                                --- #
+        # ------------------------------------------------- #
+        info     = self.morpher.solveInfo
+        report   = { "step":self.nStep, "time_solve":time2-time1, "time_update":time3-time2, \
+                     "time_step":time3-time1, "nActive":int( active.size ), \
+                     "nUpdated":int( nUpdated ), \
+                     "iterations":None if ( info is None ) else info["iterations"] }
+        self.reports += [ report ]
+        self.nStep   += 1
+        if ( not( self.silent ) ):
+            print( "[morph__incremental] step={0} :: active={1}/{2} updated={3}/{4} "\
+                   "solve={5:.3f} s update={6:.3f} s"\
+                   .format( report["step"], report["nActive"], weight.size, report["nUpdated"], \
+                            self.current.shape[0], report["time_solve"], report["time_update"] ) )
+        return( self.current )
+
+    def update( self, active=None, dalpha=None ):
+        #  -- returns the number of updated nodes
+        if ( active.size == 0 ): return( 0 )
+        morpher  = self.morpher
+        centres  = morpher.boundaries[active]
+        if ( self.nodeTree is None ):
+            self.current += mph.interpolate__rbf( nodes=self.reference, boundaries=centres, \
+                                                  alphas=dalpha, rbf_func=morpher.rbf_func, \
+                                                  coef=morpher.coef, blockSize=morpher.blockSize, \
+                                                  maxMemory=morpher.maxMemory, \
+                                                  displacementOnly=True, dtype=morpher.dtype )
+            return( self.current.shape[0] )
+        pairs    = self.nodeTree.sparse_distance_matrix( cKDTree( centres ), morpher.radius, \
+                                                         output_type="ndarray" )
+        rows     = np.unique( pairs["i"] )
+        Rmat     = sps.csr_matrix( ( morpher.phi_func( pairs["v"], coef=morpher.coef ), \
+                                     ( np.searchsorted( rows, pairs["i"] ), pairs["j"] ) ), \
+                                   shape=(rows.size,active.size) )
+        self.current[rows] += Rmat @ dalpha
+        return( rows.size )
+
+    # ------------------------------------------------- #
+    # --- resync : exact evaluation of all nodes    --- #
+    # ------------------------------------------------- #
+    def resync( self ):
+        #  -- flushes pending dalpha ( and accumulated round-off ) with one full apply
+        self.current = self.morpher.apply( nodes=self.reference )
+        self.applied = self.morpher.alphas.copy()
+        return( self.current )
+
+
+# ========================================================= #
+# ===   Execution of Pragram                            === #
+# ========================================================= #
+
+if ( __name__=="__main__" ):
+
+    #  -- oscillating membrane between fixed top / bottom planes
+    nb, nn        = 40, 60000
+    xg, yg        = np.meshgrid( np.linspace( -1.0, 1.0, nb ), np.linspace( -1.0, 1.0, nb ) )
+    plane         = np.stack( [ xg.ravel(), yg.ravel(), np.zeros( nb*nb ) ], axis=1 )
+    top, mid, bot = plane + [0,0,1.0], plane.copy(), plane - [0,0,1.0]
+    boundaries    = np.concatenate( [ top, mid, bot ], axis=0 )
+    nodes         = np.random.default_rng( 0 ).uniform( -1.0, 1.0, (nn,3) )
+    morpher       = IncrementalMorpher( boundaries=boundaries, nodes=nodes, \
+                                        rbfType="wendland_c2", coef=0.3, \
+                                        skipTolerance=1.e-6, silent=False )
+    shape         = 0.1 * ( 1.0 - mid[:,0]**2 ) * ( 1.0 - mid[:,1]**2 )
+    for it in range( 10 ):
+        displacement                 = np.zeros_like( boundaries )
+        displacement[nb*nb:2*nb*nb,2] = shape * np.sin( 0.2*np.pi*it )
+        morpher.step( displacement=displacement )
@@ -0,0 +1,111 @@
+import numpy              as np
+import concurrent.futures as cf
+from   scipy.spatial      import cKDTree
+import morph__rbf         as mph
+
+# ========================================================= #
+# ===  partition of unity ( local ) rbf morphing        === #
+# ========================================================= #
+#  -- patches :: balls of patchRadius on a regular grid covering the boundaries
+#                ( grid spacing = patchRadius / overlap, overlap > 1.16 covers the box ).
+#  -- each patch owns a small RBFMorpher ( factor cached, fit = triangular solves ).
+#  -- nodes   :: sum_p w_p(x) s_p(x) / sum_p w_p(x),  w_p = wendland C2 ( |x-c_p| / patchRadius )
+#  -- patch factorizations / fits / evaluations run in a thread pool ( nWorkers ).
+
+def morph__pou( boundaries=None, displacement=None, nodes=None, rbfType="gaussian", coef=1.0, \
+                patchRadius=None, overlap=1.5, nWorkers=None ):
+    morpher = PUMorpher( boundaries=boundaries, rbfType=rbfType, coef=coef, \
+                         patchRadius=patchRadius, overlap=overlap, nWorkers=nWorkers )
+    return( morpher.fit( displacement=displacement ).apply( nodes=nodes ) )
+
+
+class PUMorpher:
+
+    # ------------------------------------------------- #
+    # --- constructor : patches & local factors     --- #
+    # ------------------------------------------------- #
+    def __init__( self, boundaries=None, rbfType="gaussian", coef=1.0, patchRadius=None, \
+                  overlap=1.5, nWorkers=None ):
+        if ( boundaries is None ): raise ValueError( "[PUMorpher] boundaries == ???" )
+        self.boundaries = np.asarray( boundaries, dtype=np.float64 )
+        self.rbfType    = rbfType
+        self.coef       = coef
+        self.nWorkers   = nWorkers
+        self.nBoundary  = self.boundaries.shape[0]
+        bbMin, bbMax    = np.min( self.boundaries, axis=0 ), np.max( self.boundaries, axis=0 )
+        if ( patchRadius is None ):
+            #  -- default :: about 8 patches along the longest side of the box
+            patchRadius = overlap * max( np.max( bbMax-bbMin ), 1.e-12 ) / 8.0
+        self.patchRadius = patchRadius
+
+        # ------------------------------------------------- #
+        # --- [1] patch centres on a covering grid      --- #
+        # ------------------------------------------------- #
+        spacing         = patchRadius / overlap
+        axes            = [ np.arange( bbMin[ik], bbMax[ik]+spacing, spacing ) for ik in range(3) ]
+        grid            = np.meshgrid( *axes, indexing="ij" )
+        centres         = np.stack( [ grid[ik].ravel() for ik in range(3) ], axis=1 )
+        self.tree       = cKDTree( self.boundaries )
+        members         = self.tree.query_ball_point( centres, patchRadius )
+        #  -- empty patches ( far from all boundaries ) interpolate zero displacement
+        self.centres    = centres
+        self.members    = [ np.array( idx, dtype=np.int64 ) for idx in members ]
+
+        # ------------------------------------------------- #
+        # --- [2] local factorizations ( parallel )     --- #
+        # ------------------------------------------------- #
+        self.patches    = self.map( self.factorize__patch, range( self.centres.shape[0] ) )
+
+    def map( self, func, items ):
+        if ( ( self.nWorkers is None ) or ( self.nWorkers <= 1 ) ):
+            return( [ func( item ) for item in items ] )
+        with cf.ThreadPoolExecutor( max_workers=self.nWorkers ) as pool:
+            return( list( pool.map( func, items ) ) )
+
+    def factorize__patch( self, ip ):
+        if ( self.members[ip].size == 0 ): return( None )
+        return( mph.RBFMorpher( boundaries=self.boundaries[self.members[ip]], \
+                                rbfType=self.rbfType, coef=self.coef ) )
+
+    # ------------------------------------------------- #
+    # --- fit : local coefficients ( solves only )  --- #
+    # ------------------------------------------------- #
+    def fit( self, displacement=None ):
+        if ( displacement is None ): raise ValueError( "[PUMorpher.fit] displacement == ???" )
+        if ( len( displacement ) != self.nBoundary ):
+            raise ValueError( "[PUMorpher.fit] displacement.shape[0] != boundaries.shape[0]" )
+        displacement = np.asarray( displacement, dtype=np.float64 )
+        def fit__patch( ip ):
+            if ( self.patches[ip] is not None ):
+                self.patches[ip].fit( displacement=displacement[self.members[ip]] )
+        self.map( fit__patch, range( self.centres.shape[0] ) )
+        self.nDim = displacement.shape[1]
+        return( self )
+
+    # ------------------------------------------------- #
+    # --- apply : blend patch interpolants          --- #
+    # ------------------------------------------------- #
+    def apply( self, nodes=None ):
+        if ( nodes is None ): raise ValueError( "[PUMorpher.apply] nodes == ???" )
+        nodes      = np.asarray( nodes, dtype=np.float64 )
+        nodeTree   = cKDTree( nodes )
+        covered    = nodeTree.query_ball_point( self.centres, self.patchRadius )
+        def evaluate__patch( ip ):
+            index  = np.array( covered[ip], dtype=np.int64 )
+            if ( index.size == 0 ): return( None )
+            dist   = np.linalg.norm( nodes[index] - self.centres[ip], axis=1 )
+            weight = mph.phi__wendlandC2( dist, coef=self.patchRadius )
+            if ( self.patches[ip] is None ):
+                value = np.zeros( (index.size,self.nDim) )
+            else:
+                value = self.patches[ip].apply( nodes=nodes[index] ) - nodes[index]
+            return( index, weight, value )
+        numer      = np.zeros( (nodes.shape[0],self.nDim) )
+        denom      = np.zeros( (nodes.shape[0],) )
+        for ret in self.map( evaluate__patch, range( self.centres.shape[0] ) ):
+            if ( ret is None ): continue
+            index, weight, value = ret
+            np.add.at( numer, index, weight[:,None]*value )
+            np.add.at( denom, index, weight )
+        #  -- nodes outside every patch keep their position
+        return( nodes + numer / np.where( denom > 0.0, denom, 1.0 )[:,None] )
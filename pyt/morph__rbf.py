@@ -1,68 +1,765 @@
-import os, sys
-import numpy as np
+import time, warnings
+import numpy              as np
+import scipy.linalg        as sla
+import scipy.sparse        as sps
+import scipy.sparse.linalg as spl
+from   scipy.spatial      import cKDTree
+import profile__rbf       as prf
 
 # ========================================================= #
 # ===  morphing using RBF                               === #
 # ========================================================= #
 
-def morph__rbf( boundaries=None, displacement=None, nodes=None, rbfType="gaussian", coef=1.0 ):
+def morph__rbf( boundaries=None, displacement=None, nodes=None, rbfType="gaussian", coef=1.0, \
+                blockSize=None, maxMemory=None, reduceTolerance=None, nWorkers=None, \
+                cacheDir=None, precision="double", refine=0, cutoffTolerance=None, \
+                profile=None, solver="direct", tolerance=1.e-8, maxIter=1000 ):
 
-    x_, y_, z_ = 0, 1, 2
-    
     # ------------------------------------------------- #
     # --- [1] Arguments                             --- #
     # ------------------------------------------------- #
-    if ( boundaries   is None ): sys.exit( "[morph__rbf.py] boundaries   == ???" )
-    if ( nodes        is None ): sys.exit( "[morph__rbf.py] nodes        == ???" )
-    if ( displacement is None ): sys.exit( "[morph__rbf.py] displacement == ???" )
+    if ( boundaries   is None ): raise ValueError( "[morph__rbf.py] boundaries   == ???" )
+    if ( nodes        is None ): raise ValueError( "[morph__rbf.py] nodes        == ???" )
+    if ( displacement is None ): raise ValueError( "[morph__rbf.py] displacement == ???" )
+    #  -- profile :: MorphProfile / callback, phase timing & memory ( None :: no-op phases )
+    profile     = prf.get__profile( profile=profile )
     
     # ------------------------------------------------- #
-    # --- [2] define rbf : gaussian                 --- #
+    # --- [2-4] kernel & factorization of G matrix  --- #
+    # ------------------------------------------------- #
+    Gmat        = None
+    if ( reduceTolerance is not None ):
+        #  -- greedy reduction of centres :: fitted morpher on the reduced set
+        import reduce__boundaries as rdb
+        with profile.phase( "[4] reduce & fit" ):
+            reduced = rdb.reduce__boundaries( boundaries=boundaries, displacement=displacement, \
+                                              rbfType=rbfType, coef=coef, \
+                                              tolerance=reduceTolerance )
+        morpher     = reduced["morpher"]
+        morpher.blockSize, morpher.maxMemory = blockSize, maxMemory
+        morpher.nWorkers                     = nWorkers
+        morpher.cache                        = open__cache( cache=cacheDir )
+        morpher.dtype                        = get__dtype( precision=precision )
+        morpher.set__cutoff( cutoffTolerance=cutoffTolerance )
+    else:
+        #  -- cacheDir :: factor of G and R are reused across runs ( opt-in )
+        morpher     = RBFMorpher( boundaries=boundaries, rbfType=rbfType, coef=coef, \
+                                  blockSize=blockSize, maxMemory=maxMemory, nWorkers=nWorkers, \
+                                  cache=cacheDir, precision=precision, refine=refine, \
+                                  cutoffTolerance=cutoffTolerance, solver=solver, \
+                                  tolerance=tolerance, maxIter=maxIter, deferred=True )
+        if ( ( morpher.cache is None ) and ( solver == "direct" ) ):
+            with profile.phase( "[4] G matrix" ):
+                Gmat = morpher.assemble()
+        with profile.phase( "[4] factorize" ):
+            morpher.factorize( Gmat=Gmat )
+        #  -- G is kept only for the profile report ( estimate re-assembles it otherwise )
+        if ( not( profile.enabled ) ): Gmat = None
+    
+    # ------------------------------------------------- #
+    # --- [5] solve coefficient                     --- #
+    # ------------------------------------------------- #
+    if ( reduceTolerance is None ):
+        with profile.phase( "[5] solve" ):
+            morpher.fit( displacement=displacement )
+    
+    # ------------------------------------------------- #
+    # --- [6] interpolation                         --- #
+    # ------------------------------------------------- #
+    with profile.phase( "[6] interpolation" ):
+        results = morpher.apply( nodes=nodes )
+    if ( profile.enabled ):
+        #  -- sizes & condition estimate only when profiling ( O(M^2) for the estimate )
+        nNodes  = np.shape( nodes )[0]
+        profile.add( nBoundary=morpher.nBoundary, nNodes=nNodes, factorType=morpher.factorType, \
+                     G_shape=( morpher.nBoundary, morpher.nBoundary ), \
+                     G_nnz=( Gmat.nnz if sps.issparse( Gmat ) else morpher.nBoundary**2 ) \
+                     if ( Gmat is not None ) else None, \
+                     R_shape=( nNodes, morpher.nBoundary ), \
+                     R_dtype=np.dtype( morpher.dtype ).name, \
+                     blockSize=get__blockSize( nNodes=nNodes, nBoundaries=morpher.nBoundary, \
+                                               blockSize=morpher.blockSize, \
+                                               maxMemory=morpher.maxMemory, \
+                                               itemSize=np.dtype( morpher.dtype ).itemsize ) )
+        if ( morpher.solveInfo is not None ):
+            info    = morpher.solveInfo
+            profile.add( cg_iterations=info["iterations"], cg_converged=info["converged"], \
+                         cg_tolerance=info["tolerance"], \
+                         cg_residual=float( np.max( info["residuals"][-1] ) ), \
+                         cg_residuals=info["residuals"] )
+        with profile.phase( "condition estimate" ):
+            profile.add( condition=morpher.estimate__condition( Gmat=Gmat ) )
+    return( results )
+
+
+# ========================================================= #
+# ===  batched morphing  ( K cases, one factorization ) === #
+# ========================================================= #
+
+def morph__batch( boundaries=None, displacements=None, nodes=None, rbfType="gaussian", coef=1.0, \
+                  blockSize=None, maxMemory=None, nWorkers=None ):
+
+    # ------------------------------------------------- #
+    # --- [1] Arguments                             --- #
+    # ------------------------------------------------- #
+    if ( boundaries    is None ): raise ValueError( "[morph__batch] boundaries    == ???" )
+    if ( nodes         is None ): raise ValueError( "[morph__batch] nodes         == ???" )
+    if ( displacements is None ): raise ValueError( "[morph__batch] displacements == ???" )
+    if ( np.ndim( displacements ) != 3 ):
+        raise ValueError( "[morph__batch] displacements must be (K,M,3)" )
+
+    # ------------------------------------------------- #
+    # --- [2] one factorization, multi-RHS solve    --- #
+    # ------------------------------------------------- #
+    morpher     = RBFMorpher( boundaries=boundaries, rbfType=rbfType, coef=coef, \
+                              blockSize=blockSize, maxMemory=maxMemory, nWorkers=nWorkers )
+    morpher.fit( displacement=displacements )
+
+    # ------------------------------------------------- #
+    # --- [3] morphed nodes of each case ( lazy )   --- #
+    # ------------------------------------------------- #
+    return( morpher.iterate( nodes=nodes ) )
+
+
+# ========================================================= #
+# ===  RBF morpher ( factorized G, reusable )           === #
+# ========================================================= #
+
+class RBFMorpher:
+
+    # ------------------------------------------------- #
+    # --- constructor : assemble & factorize G      --- #
+    # ------------------------------------------------- #
+    def __init__( self, boundaries=None, rbfType="gaussian", coef=1.0, \
+                  blockSize=None, maxMemory=None, nWorkers=None, deferred=False, \
+                  solver="direct", tolerance=1.e-8, maxIter=1000, clusterSize=256, cache=None, \
+                  precision="double", refine=0, cutoffTolerance=None ):
+        if ( boundaries is None ): raise ValueError( "[RBFMorpher] boundaries == ???" )
+        if ( not( solver in [ "direct", "cg" ] ) ):
+            raise ValueError( "[RBFMorpher] unknown solver :: {0}".format( solver ) )
+        self.boundaries = np.asarray( boundaries, dtype=np.float64 )
+        self.rbfType    = rbfType
+        self.coef       = coef
+        self.blockSize  = blockSize
+        self.maxMemory  = maxMemory
+        self.nWorkers   = nWorkers
+        self.solver     = solver
+        self.cgSettings = { "tolerance":tolerance, "maxIter":maxIter, "clusterSize":clusterSize }
+        self.solveInfo  = None
+        self.rbf_func   = get__rbfFunction( rbfType=rbfType )
+        self.phi_func   = get__rbfKernel  ( rbfType=rbfType )
+        self.compact    = is__compactKernel( rbfType=rbfType )
+        self.alphas     = None
+        self.nCases     = None
+        self.dmax       = None
+        self.nBoundary  = self.boundaries.shape[0]
+        self.cache      = open__cache( cache=cache )
+        #  -- precision :: dtype of the R evaluation ( G is always assembled in float64 )
+        #  -- refine    :: mixed precision solve, dense G is factorized in float32 and at most
+        #                  refine steps of  alpha += G32^-1 ( d - G @ alpha )  are taken until
+        #                  || d - G @ alpha || <= sqrt(M) eps64 || G ||_1 || alpha ||  ( the
+        #                  residual of a float64 factor );  if not reached, G is refactorized
+        #                  and solved in float64 ( only float64 factors are cached )
+        self.dtype      = get__dtype( precision=precision )
+        self.refine     = refine
+        self.Gmat       = None
+        self.set__cutoff( cutoffTolerance=cutoffTolerance )
+        if ( not( deferred ) ): self.factorize()
+
+    # ------------------------------------------------- #
+    # --- far-field cutoff of the gaussian kernel   --- #
+    # ------------------------------------------------- #
+    def set__cutoff( self, cutoffTolerance=None ):
+        #  -- phi( r ) < tol for r > r_c = coef sqrt( ln(1/tol) ) :: R is evaluated sparsely
+        #     from a KD-tree, truncation error | s - s_c | <= tol sum_j | alpha_j |
+        #  -- compact kernels are exact with radius = coef ( no cutoff needed )
+        self.cutoffTolerance = cutoffTolerance
+        if ( ( cutoffTolerance is None ) or ( self.compact ) ):
+            self.radius = self.coef if ( self.compact ) else None
+            return( self )
+        self.radius = get__cutoffRadius( coef=self.coef, tolerance=cutoffTolerance )
+        self.tree   = cKDTree( self.boundaries )
+        return( self )
+
+    # ------------------------------------------------- #
+    # --- assemble G  ( dense / sparse )            --- #
+    # ------------------------------------------------- #
+    def assemble( self ):
+        self.nBoundary  = self.boundaries.shape[0]
+        if ( self.compact ):
+            #  -- only pairs within the support radius ( = coef ) are non-zero
+            self.tree   = cKDTree( self.boundaries )
+            pairs       = self.tree.sparse_distance_matrix( self.tree, self.coef, \
+                                                            output_type="ndarray" )
+            Gmat        = sps.csc_matrix( ( self.phi_func( pairs["v"], coef=self.coef ), \
+                                            ( pairs["i"], pairs["j"] ) ), \
+                                          shape=(self.nBoundary,self.nBoundary) )
+        else:
+            #  -- broadcasting (M,1,3)-(1,M,3) gives the same pairs as meshgrid + concatenate
+            Gmat        = self.rbf_func( self.boundaries[:,None,:], self.boundaries[None,:,:], \
+                                         coef=self.coef )
+        return( Gmat )
+
+    # ------------------------------------------------- #
+    # --- factorize G  ( Cholesky / LDL^T fallback ) --- #
+    # ------------------------------------------------- #
+    def factorize( self, Gmat=None ):
+        if ( self.solver == "cg" ):
+            #  -- matrix-free :: G is never stored, only the block-Jacobi preconditioner
+            import solve__matrixFree as smf
+            if ( self.compact ): self.tree = cKDTree( self.boundaries )
+            self.factorType = "matrix-free"
+            self.factor     = smf.BlockJacobi( boundaries=self.boundaries, \
+                                               rbf_func=self.rbf_func, coef=self.coef, \
+                                               clusterSize=self.cgSettings["clusterSize"] )
+            return( self )
+        if ( self.cache is not None ):
+            key    = self.cache.make__key( prefix="factor", arrays=[ self.boundaries ], \
+                                           rbfType=self.rbfType, coef=self.coef )
+            stored = self.cache.load__factor( key=key )
+            if   ( ( stored is None ) or ( stored[0] == "cholesky32" ) ):
+                stored = None
+                pass
+            elif ( self.compact ):
+                #  -- sparse factors are not serializable :: cached G skips the assembly only
+                self.tree  = cKDTree( self.boundaries )
+                Gmat       = stored[1].tocsc()
+            else:
+                self.factorType, self.factor = stored
+                return( self )
+        if ( Gmat is None ): Gmat = self.assemble()
+        if ( self.refine > 0 ): self.Gmat = Gmat
+        self.factorize__matrix( Gmat=Gmat )
+        if ( ( self.cache is not None ) and ( stored is None ) and \
+             ( self.factorType != "cholesky32" ) ):
+            self.cache.save__factor( key=key, factorType=self.factorType, \
+                                     factor=( Gmat if self.compact else self.factor ) )
+        return( self )
+
+    def factorize__matrix( self, Gmat=None, mixed=True ):
+        if ( self.compact ):
+            try:
+                import sksparse.cholmod as chm
+                self.factorType = "sparse-cholesky"
+                self.factor     = chm.cholesky( Gmat )
+            except ImportError:
+                self.factorType = "sparse-lu"
+                self.factor     = spl.splu( Gmat )
+            return( self )
+        if ( mixed and ( self.refine > 0 ) ):
+            try:
+                self.factorType = "cholesky32"
+                self.factor     = sla.cho_factor( Gmat.astype( np.float32 ), lower=True, \
+                                                  check_finite=False )
+                return( self )
+            except np.linalg.LinAlgError:
+                pass
+        try:
+            self.factorType = "cholesky"
+            self.factor     = sla.cho_factor( Gmat, lower=True, check_finite=False )
+        except np.linalg.LinAlgError:
+            #  -- numerically semi-definite G ( e.g. too large coef ) :: symmetric indefinite
+            self.factorType = "ldl"
+            lu, dmat, perm  = sla.ldl( Gmat, lower=True, check_finite=False )
+            band            = np.zeros( (3,self.nBoundary) )
+            band[0,1: ]     = np.diagonal( dmat, +1 )
+            band[1,:  ]     = np.diagonal( dmat,  0 )
+            band[2,:-1]     = np.diagonal( dmat, -1 )
+            self.factor     = ( lu[perm], band, perm )
+        return( self )
+
+    # ------------------------------------------------- #
+    # --- 1-norm condition estimate of G            --- #
+    # ------------------------------------------------- #
+    def estimate__condition( self, Gmat=None ):
+        #  -- cholesky :: LAPACK dpocon,  otherwise :: Hager / Higham estimate of || G^-1 ||_1
+        if ( self.factorType == "matrix-free" ): return( None )
+        if ( Gmat is None ): Gmat = self.assemble()
+        if ( sps.issparse( Gmat ) ):
+            anorm = float( abs( Gmat ).sum( axis=0 ).max() )
+        else:
+            anorm = float( np.max( np.sum( np.abs( Gmat ), axis=0 ) ) )
+        if ( self.factorType == "cholesky" ):
+            rcond, info = sla.lapack.dpocon( self.factor[0], anorm, uplo="L" )
+            return( float( 1.0 / rcond ) if ( rcond > 0.0 ) else np.inf )
+        shape = ( self.nBoundary, self.nBoundary )
+        Ginv  = spl.LinearOperator( shape, matvec=lambda vec: self.solve( rhs=vec ), \
+                                    rmatvec=lambda vec: self.solve( rhs=vec ), dtype=np.float64 )
+        return( float( anorm * spl.onenormest( Ginv ) ) )
+
+    # ------------------------------------------------- #
+    # --- solve  G @ x = rhs  with stored factor    --- #
     # ------------------------------------------------- #
-    def rbf__gaussian( xi, xj, coef=0.5 ):
-        dist  = np.sqrt( np.sum( ( xi - xj )**2, axis=-1 ) )
-        value = np.exp( - ( dist / coef )**2 )
-        return( value )
+    def solve( self, rhs=None, x0=None ):
+        if ( rhs is None ): raise ValueError( "[RBFMorpher.solve] rhs == ???" )
+        rhs = np.asarray( rhs, dtype=np.float64 )
+        if ( self.factorType == "matrix-free" ):
+            import solve__matrixFree as smf
+            ret, self.solveInfo = smf.solve__matrixFree( boundaries=self.boundaries, rhs=rhs, \
+                                                         rbf_func=self.rbf_func, coef=self.coef, \
+                                                         tolerance=self.cgSettings["tolerance"], \
+                                                         maxIter=self.cgSettings["maxIter"], \
+                                                         maxMemory=self.maxMemory, x0=x0, \
+                                                         preconditioner=self.factor )
+            if ( not( self.solveInfo["converged"] ) ):
+                warnings.warn( "[RBFMorpher.solve] cg not converged :: {0} iterations, "\
+                               "residual={1:.3e} > tolerance={2:.1e}"\
+                               .format( self.solveInfo["iterations"], \
+                                        float( np.max( self.solveInfo["residuals"][-1] ) ), \
+                                        self.solveInfo["tolerance"] ), RuntimeWarning )
+            return( ret )
+        if ( self.factorType == "sparse-cholesky" ):
+            return( self.factor( rhs ) )
+        if ( self.factorType == "sparse-lu" ):
+            return( self.factor.solve( rhs ) )
+        if ( self.factorType == "cholesky" ):
+            return( sla.cho_solve( self.factor, rhs, check_finite=False ) )
+        if ( self.factorType == "cholesky32" ):
+            ret = sla.cho_solve( self.factor, rhs.astype( np.float32 ), check_finite=False )
+            return( ret.astype( np.float64 ) )
+        # -- A = P^T L D L^T P  ( L = lu[perm] : unit lower triangular )
+        Lmat, band, perm = self.factor
+        yvec     = sla.solve_triangular( Lmat, rhs[perm], lower=True, unit_diagonal=True, \
+                                         check_finite=False )
+        yvec     = sla.solve_banded( (1,1), band, yvec, check_finite=False )
+        yvec     = sla.solve_triangular( Lmat.T, yvec, lower=False, unit_diagonal=True, \
+                                         check_finite=False )
+        ret      = np.empty_like( yvec )
+        ret[perm]= yvec
+        return( ret )
 
     # ------------------------------------------------- #
-    # --- [3] function to be used                   --- #
+    # --- fit : coefficients for displacement       --- #
     # ------------------------------------------------- #
-    if   ( rbfType.lower() == "gaussian" ):
+    def fit( self, displacement=None ):
+        if ( displacement is None ): raise ValueError( "[RBFMorpher.fit] displacement == ???" )
+        displacement = np.asarray( displacement, dtype=np.float64 )
+        if ( displacement.ndim == 3 ):
+            #  -- batch (K,M,3) -> multi-RHS (M,3K) :: one solve for all cases
+            self.nCases  = displacement.shape[0]
+            displacement = np.ascontiguousarray( np.transpose( displacement, (1,0,2) ) )
+            displacement = displacement.reshape( displacement.shape[0], -1 )
+        else:
+            self.nCases  = None
+        if ( len( displacement ) != self.nBoundary ):
+            raise ValueError( "[RBFMorpher.fit] displacement.shape[0] != boundaries.shape[0]" )
+        self.dmax   = float( np.max( np.abs( displacement ) ) )
+        #  -- previous alphas warm-start the iterative solver ( ignored by direct solves )
+        x0          = self.alphas if ( ( self.alphas is not None ) and \
+                                       ( self.alphas.shape == np.shape( displacement ) ) ) else None
+        self.alphas = self.solve( rhs=displacement, x0=x0 )
+        if ( self.factorType == "cholesky32" ):
+            #  -- residual in float64, correction with the float32 factor
+            if ( self.Gmat is None ): self.Gmat = self.assemble()
+            anorm       = float( np.max( np.sum( np.abs( self.Gmat ), axis=0 ) ) )
+            scale       = np.sqrt( self.nBoundary ) * np.finfo( np.float64 ).eps * anorm
+            residual    = displacement - self.Gmat @ self.alphas
+            for it in range( self.refine ):
+                if ( np.linalg.norm( residual ) <= scale*np.linalg.norm( self.alphas ) ): break
+                self.alphas = self.alphas + self.solve( rhs=residual )
+                residual    = displacement - self.Gmat @ self.alphas
+            if ( np.linalg.norm( residual ) > scale*np.linalg.norm( self.alphas ) ):
+                #  -- not converged ( cond(G) too large for the float32 factor ) :: float64
+                self.factorize__matrix( Gmat=self.Gmat, mixed=False )
+                self.alphas = self.solve( rhs=displacement )
+        return( self )
+
+    # ------------------------------------------------- #
+    # --- apply : morph nodes with fitted alphas    --- #
+    # ------------------------------------------------- #
+    def apply( self, nodes=None, blockSize=None, maxMemory=None, nWorkers=None, \
+               displacementOnly=False, timings=None ):
+        #  -- timings :: dict, accumulates "R" ( kernel evaluation ) & "apply" ( R @ alphas )
+        #                seconds of the serial / cached paths
+        if ( nodes       is None ): raise ValueError( "[RBFMorpher.apply] nodes == ???" )
+        if ( self.alphas is None ):
+            raise RuntimeError( "[RBFMorpher.apply] call fit() before apply()" )
+        if ( ( self.nCases is not None ) and not( displacementOnly ) ):
+            raise RuntimeError( "[RBFMorpher.apply] batched fit :: use iterate()" )
+        if ( blockSize   is None ): blockSize = self.blockSize
+        if ( maxMemory   is None ): maxMemory = self.maxMemory
+        if ( nWorkers    is None ): nWorkers  = self.nWorkers
+        if ( self.cache is not None ):
+            results = self.apply__cached( nodes=nodes, blockSize=blockSize, maxMemory=maxMemory, \
+                                          displacementOnly=displacementOnly, timings=timings )
+            if ( results is not None ): return( results )
+        if ( ( nWorkers is not None ) and ( nWorkers > 1 ) ):
+            import interpolate__parallel as ipl
+            results = ipl.interpolate__parallel( nodes=nodes, boundaries=self.boundaries, \
+                                                 alphas=self.alphas, rbfType=self.rbfType, \
+                                                 coef=self.coef, nWorkers=nWorkers, \
+                                                 blockSize=blockSize, maxMemory=maxMemory, \
+                                                 displacementOnly=displacementOnly, \
+                                                 dtype=self.dtype, radius=self.radius )
+            return( results )
+        if ( self.radius is not None ):
+            results = interpolate__sparse( nodes=nodes, tree=self.tree, alphas=self.alphas, \
+                                           phi_func=self.phi_func, coef=self.coef, \
+                                           radius=self.radius, \
+                                           blockSize=blockSize, maxMemory=maxMemory, \
+                                           displacementOnly=displacementOnly, dtype=self.dtype, \
+                                           timings=timings )
+            return( results )
+        results = interpolate__rbf( nodes=nodes, boundaries=self.boundaries, alphas=self.alphas, \
+                                    rbf_func=self.rbf_func, coef=self.coef, \
+                                    blockSize=blockSize, maxMemory=maxMemory, \
+                                    displacementOnly=displacementOnly, dtype=self.dtype, \
+                                    timings=timings )
+        return( results )
+
+    # ------------------------------------------------- #
+    # --- apply with R stored in the cache          --- #
+    # ------------------------------------------------- #
+    def apply__cached( self, nodes=None, blockSize=None, maxMemory=None, displacementOnly=False, \
+                       timings=None ):
+        #  -- warm run :: R is memory-mapped, only R @ alphas is computed
+        #  -- returns None if R exceeds the cache budget ( caller evaluates R as usual )
+        nodes   = np.asarray( nodes, dtype=np.float64 )
+        nNodes  = nodes.shape[0]
+        nBlock  = get__blockSize( nNodes=nNodes, nBoundaries=self.nBoundary, \
+                                  blockSize=blockSize, maxMemory=maxMemory, \
+                                  itemSize=np.dtype( self.dtype ).itemsize )
+        prefix  = "R" if ( self.dtype == np.float64 ) else "R32"
+        if ( ( self.radius is not None ) and not( self.compact ) ):
+            prefix += "_cut{0!r}".format( float( self.cutoffTolerance ) )
+        key     = self.cache.make__key( prefix=prefix, arrays=[ self.boundaries, nodes ], \
+                                        rbfType=self.rbfType, coef=self.coef )
+        time1   = time.perf_counter()
+        Rmat    = self.cache.load__R( key=key )
+        if ( ( Rmat is None ) and ( self.radius is not None ) ):
+            Rmat = assemble__sparseR( nodes=nodes, tree=self.tree, phi_func=self.phi_func, \
+                                      coef=self.coef, radius=self.radius, blockSize=blockSize, \
+                                      maxMemory=maxMemory, dtype=self.dtype )
+            self.cache.save__sparseR( key=key, Rmat=Rmat )
+        elif ( Rmat is None ):
+            opened = self.cache.open__R( key=key, shape=(nNodes,self.nBoundary), dtype=self.dtype )
+            if ( opened is None ): return( None )
+            path, Rmat = opened
+            origin = np.mean( self.boundaries, axis=0 )
+            pts    = ( self.boundaries - origin ).astype( self.dtype )
+            for iS in range( 0, nNodes, nBlock ):
+                iE            = min( iS+nBlock, nNodes )
+                Rmat[iS:iE,:] = self.rbf_func( ( nodes[iS:iE,None,:] - origin ).astype( self.dtype ), \
+                                               pts[None,:,:], coef=self.coef )
+            Rmat.flush()
+            self.cache.commit( path=path )
+        time1   = add__timing( timings=timings, key="R", time1=time1 )
+        if ( displacementOnly ):
+            results = np.zeros( (nNodes,self.alphas.shape[1]), dtype=np.float64 )
+        else:
+            results = np.array( nodes, dtype=np.float64, copy=True )
+        alphas  = self.alphas.astype( self.dtype, copy=False )
+        if ( sps.issparse( Rmat ) ):
+            results += Rmat @ alphas
+            add__timing( timings=timings, key="apply", time1=time1 )
+            return( results )
+        for iS in range( 0, nNodes, nBlock ):
+            iE                = min( iS+nBlock, nNodes )
+            results[iS:iE,:] += np.dot( Rmat[iS:iE], alphas )
+        add__timing( timings=timings, key="apply", time1=time1 )
+        return( results )
+
+    # ------------------------------------------------- #
+    # --- error of single precision evaluation      --- #
+    # ------------------------------------------------- #
+    def check__precision( self, nodes=None, nSample=2000, tolerance=1.e-3 ):
+        #  -- compares float32 / float64 shifts s = R @ alpha on a sample of nodes.
+        #     bound per node ( u = 2^-24, D = max |x - centroid|, L = max |phi'(r)| ) ::
+        #       | s32 - s64 |_i <= 2 sqrt(3) L D u  sum_j | alpha_j |
+        #                        + ( 5 + sqrt(M) ) u  sum_j R_ij | alpha_j |
+        #     ( coordinate rounding;  exp / pow rounding, alpha rounding and the float32 dot
+        #       product, with the usual sqrt(M) growth of rounding errors instead of M )
+        #     ratio    = max( error / bound )    :: > 1 means the rounding model is violated
+        #     relError = max error / max | d |    :: error relative to the boundary displacement
+        #     passed   = ( ratio <= 1 ) and ( relError <= tolerance )
+        if ( nodes       is None ): raise ValueError( "[RBFMorpher.check__precision] nodes == ???" )
+        if ( self.alphas is None ):
+            raise RuntimeError( "[RBFMorpher.check__precision] call fit() first" )
+        nodes   = np.asarray( nodes, dtype=np.float64 )
+        index   = np.linspace( 0, nodes.shape[0]-1, min( nSample, nodes.shape[0] ) ).astype( int )
+        shifts  = {}
+        for dtype in [ np.float64, np.float32 ]:
+            shifts[dtype] = interpolate__rbf( nodes=nodes[index], boundaries=self.boundaries, \
+                                              alphas=self.alphas, rbf_func=self.rbf_func, \
+                                              coef=self.coef, blockSize=self.blockSize, \
+                                              maxMemory=self.maxMemory, displacementOnly=True, \
+                                              dtype=dtype )
+        unit    = np.finfo( np.float32 ).eps / 2.0
+        origin  = np.mean( self.boundaries, axis=0 )
+        radius  = max( np.max( np.abs( self.boundaries - origin ) ), \
+                       np.max( np.abs( nodes[index]    - origin ) ) )
+        rr      = np.linspace( 0.0, 3.0*self.coef, 3001 )
+        slope   = np.max( np.abs( np.diff( self.phi_func( rr, coef=self.coef ) ) ) ) / ( rr[1]-rr[0] )
+        #  -- kernels are non-negative :: |R| @ |alpha| = R @ |alpha|
+        weight  = interpolate__rbf( nodes=nodes[index], boundaries=self.boundaries, \
+                                    alphas=np.abs( self.alphas ), rbf_func=self.rbf_func, \
+                                    coef=self.coef, blockSize=self.blockSize, \
+                                    maxMemory=self.maxMemory, displacementOnly=True )
+        bound   = unit * ( 2.0*np.sqrt( 3.0 )*slope*radius*np.sum( np.abs( self.alphas ), axis=0 ) \
+                           + ( 5.0 + np.sqrt( self.nBoundary ) )*weight )
+        error   = np.abs( shifts[np.float32] - shifts[np.float64] )
+        relError= float( np.max( error ) ) / self.dmax if ( self.dmax > 0.0 ) \
+            else float( np.max( error ) )
+        ratio   = float( np.max( error / np.maximum( bound, 1.e-300 ) ) )
+        return( { "maxError":np.max( error, axis=0 ), "bound":np.max( bound, axis=0 ), \
+                  "ratio":ratio, "relError":relError, "tolerance":tolerance, \
+                  "passed":bool( ( ratio <= 1.0 ) and ( relError <= tolerance ) ), \
+                  "nSample":index.size } )
+
+    # ------------------------------------------------- #
+    # --- iterate : morphed nodes of batched cases  --- #
+    # ------------------------------------------------- #
+    def iterate( self, nodes=None, blockSize=None, maxMemory=None, nWorkers=None ):
+        #  -- R is streamed once, R @ [ alpha_1 ... alpha_K ] is one GEMM per block
+        if ( nodes is None ): raise ValueError( "[RBFMorpher.iterate] nodes == ???" )
+        nCases  = 1 if ( self.nCases is None ) else self.nCases
+        nodes   = np.asarray( nodes, dtype=np.float64 )
+        nDim    = nodes.shape[1]
+        shifts  = self.apply( nodes=nodes, blockSize=blockSize, maxMemory=maxMemory, \
+                              nWorkers=nWorkers, displacementOnly=True )
+        for ik in range( nCases ):
+            yield( nodes + shifts[:,ik*nDim:(ik+1)*nDim] )
+
+
+# ========================================================= #
+# ===  kernel function from rbfType                     === #
+# ========================================================= #
+#  -- rbf__xxx( xi, xj, coef ) :: dense pairwise evaluation
+#  -- phi__xxx( dist,   coef ) :: radial profile, used by the sparse path
+#  -- wendland kernels :: coef is the support radius, phi = 0 for dist >= coef
+
+def get__rbfFunction( rbfType="gaussian" ):
+    if   ( rbfType.lower() == "gaussian"    ):
         rbf_func = rbf__gaussian
+    elif ( rbfType.lower() == "wendland_c0" ):
+        rbf_func = rbf__wendlandC0
+    elif ( rbfType.lower() == "wendland_c2" ):
+        rbf_func = rbf__wendlandC2
+    elif ( rbfType.lower() == "wendland_c4" ):
+        rbf_func = rbf__wendlandC4
     else:
-        print( "[morph__rbf] unknown rbf Kernel Type :: {0} ".format( rbfType ) )
-        sys.exit()
-        
-    # ------------------------------------------------- #
-    # --- [4] make G matrix                         --- #
-    # ------------------------------------------------- #
-    nTrain      = boundaries.shape[0]
-    xvec1,xvec2 = np.meshgrid( boundaries[:,x_], boundaries[:,x_], indexing="ij" )
-    yvec1,yvec2 = np.meshgrid( boundaries[:,y_], boundaries[:,y_], indexing="ij" )
-    zvec1,zvec2 = np.meshgrid( boundaries[:,z_], boundaries[:,z_], indexing="ij" )
-    tvec1       = np.concatenate( [ xvec1[:,:,None],yvec1[:,:,None],zvec1[:,:,None] ], axis=2 )
-    tvec2       = np.concatenate( [ xvec2[:,:,None],yvec2[:,:,None],zvec2[:,:,None] ], axis=2 )
-    Gmat        = rbf_func( tvec1, tvec2, coef=coef )
-    Ginv        = np.linalg.inv( Gmat )
-    
+        raise ValueError( "[morph__rbf] unknown rbf Kernel Type :: {0} ".format( rbfType ) )
+    return( rbf_func )
+
+
+def get__rbfKernel( rbfType="gaussian" ):
+    if   ( rbfType.lower() == "gaussian"    ):
+        phi_func = phi__gaussian
+    elif ( rbfType.lower() == "wendland_c0" ):
+        phi_func = phi__wendlandC0
+    elif ( rbfType.lower() == "wendland_c2" ):
+        phi_func = phi__wendlandC2
+    elif ( rbfType.lower() == "wendland_c4" ):
+        phi_func = phi__wendlandC4
+    else:
+        raise ValueError( "[morph__rbf] unknown rbf Kernel Type :: {0} ".format( rbfType ) )
+    return( phi_func )
+
+
+def is__compactKernel( rbfType="gaussian" ):
+    return( rbfType.lower() in [ "wendland_c0", "wendland_c2", "wendland_c4" ] )
+
+
+def get__cutoffRadius( coef=1.0, tolerance=1.e-8 ):
+    #  -- gaussian :: exp( -( r / coef )^2 ) = tolerance
+    return( coef * np.sqrt( np.log( 1.0 / tolerance ) ) )
+
+
+def get__dtype( precision="double" ):
+    if   ( precision.lower() == "double" ):
+        return( np.float64 )
+    elif ( precision.lower() == "single" ):
+        return( np.float32 )
+    raise ValueError( "[morph__rbf] unknown precision :: {0} ".format( precision ) )
+
+
+def open__cache( cache=None ):
+    #  -- cache :: None ( disabled ), directory name, or RBFCache instance
+    if ( ( cache is None ) or not( isinstance( cache, str ) ) ): return( cache )
+    import cache__rbf as crb
+    return( crb.RBFCache( cacheDir=cache ) )
+
+
+# ========================================================= #
+# ===  rbf kernel : gaussian                            === #
+# ========================================================= #
+
+def rbf__gaussian( xi, xj, coef=0.5 ):
+    dist  = np.sqrt( np.sum( ( xi - xj )**2, axis=-1 ) )
+    value = np.exp( - ( dist / coef )**2 )
+    return( value )
+
+def phi__gaussian( dist, coef=0.5 ):
+    value = np.exp( - ( dist / coef )**2 )
+    return( value )
+
+
+# ========================================================= #
+# ===  rbf kernel : wendland C0 / C2 / C4               === #
+# ========================================================= #
+
+def rbf__wendlandC0( xi, xj, coef=1.0 ):
+    dist  = np.sqrt( np.sum( ( xi - xj )**2, axis=-1 ) )
+    return( phi__wendlandC0( dist, coef=coef ) )
+
+def rbf__wendlandC2( xi, xj, coef=1.0 ):
+    dist  = np.sqrt( np.sum( ( xi - xj )**2, axis=-1 ) )
+    return( phi__wendlandC2( dist, coef=coef ) )
+
+def rbf__wendlandC4( xi, xj, coef=1.0 ):
+    dist  = np.sqrt( np.sum( ( xi - xj )**2, axis=-1 ) )
+    return( phi__wendlandC4( dist, coef=coef ) )
+
+def phi__wendlandC0( dist, coef=1.0 ):
+    rr    = np.minimum( dist / coef, 1.0 )
+    value = ( 1.0 - rr )**2
+    return( value )
+
+def phi__wendlandC2( dist, coef=1.0 ):
+    rr    = np.minimum( dist / coef, 1.0 )
+    value = ( 1.0 - rr )**4 * ( 4.0*rr + 1.0 )
+    return( value )
+
+def phi__wendlandC4( dist, coef=1.0 ):
+    rr    = np.minimum( dist / coef, 1.0 )
+    value = ( 1.0 - rr )**6 * ( 35.0*rr**2 + 18.0*rr + 3.0 ) / 3.0
+    return( value )
+
+
+# ========================================================= #
+# ===  number of nodes evaluated at once                === #
+# ========================================================= #
+
+def get__blockSize( nNodes=None, nBoundaries=None, blockSize=None, maxMemory=None, itemSize=8 ):
+
     # ------------------------------------------------- #
-    # --- [5] solve coefficient                     --- #
+    # --- [1] explicit block size has priority      --- #
+    # ------------------------------------------------- #
+    if ( blockSize is not None ):
+        return( int( max( 1, min( blockSize, nNodes ) ) ) )
+    if ( maxMemory is None ):
+        return( int( max( 1, nNodes ) ) )
+
     # ------------------------------------------------- #
-    alphas      = np.dot( Ginv, displacement )
+    # --- [2] block size from memory limit  [MB]    --- #
+    # ------------------------------------------------- #
+    #  -- per node row :: (M,3) difference + (M) distance + (M) kernel ( itemSize = 8 : float64 )
+    bytesPerRow = itemSize * nBoundaries * ( 3 + 1 + 1 )
+    nBlock      = int( maxMemory * 1024**2 ) // max( 1, bytesPerRow )
+    return( int( max( 1, min( nBlock, nNodes ) ) ) )
+
+
+def add__timing( timings=None, key=None, time1=None ):
+    #  -- timings[key] += now - time1  ( timings = None :: no-op ), returns now
+    time2 = time.perf_counter()
+    if ( timings is not None ): timings[key] = timings.get( key, 0.0 ) + ( time2 - time1 )
+    return( time2 )
+
+
+# ========================================================= #
+# ===  blockwise interpolation  ( nodes + R @ alphas )  === #
+# ========================================================= #
+
+def interpolate__rbf( nodes=None, boundaries=None, alphas=None, rbf_func=rbf__gaussian, \
+                      coef=1.0, blockSize=None, maxMemory=None, displacementOnly=False, \
+                      dtype=np.float64, timings=None ):
+
+    # ------------------------------------------------- #
+    # --- [1] Arguments                             --- #
+    # ------------------------------------------------- #
+    if ( nodes      is None ): raise ValueError( "[interpolate__rbf] nodes      == ???" )
+    if ( boundaries is None ): raise ValueError( "[interpolate__rbf] boundaries == ???" )
+    if ( alphas     is None ): raise ValueError( "[interpolate__rbf] alphas     == ???" )
+    nNodes      = nodes.shape[0]
+    nBlock      = get__blockSize( nNodes=nNodes, nBoundaries=boundaries.shape[0], \
+                                  blockSize=blockSize, maxMemory=maxMemory, \
+                                  itemSize=np.dtype( dtype ).itemsize )
     
     # ------------------------------------------------- #
-    # --- [6] interpolation                         --- #
+    # --- [2] evaluate R block by block             --- #
     # ------------------------------------------------- #
-    xvec1,xvec2 = np.meshgrid( nodes[:,x_], boundaries[:,x_], indexing="ij" )
-    yvec1,yvec2 = np.meshgrid( nodes[:,y_], boundaries[:,y_], indexing="ij" )
-    zvec1,zvec2 = np.meshgrid( nodes[:,z_], boundaries[:,z_], indexing="ij" )
-    tvec1       = np.concatenate( [ xvec1[:,:,None],yvec1[:,:,None],zvec1[:,:,None] ], axis=2 )
-    tvec2       = np.concatenate( [ xvec2[:,:,None],yvec2[:,:,None],zvec2[:,:,None] ], axis=2 )
-    Rmat        = rbf_func( tvec1, tvec2, coef=coef )
-    results     = nodes + np.dot( Rmat, alphas )
+    #  -- peak memory is O( nBlock x M ) instead of O( N x M )
+    #  -- displacementOnly :: returns R @ alphas ( any number of columns, e.g. batched cases )
+    #  -- dtype = float32    :: R and R @ alphas in single precision, coordinates are shifted to
+    #                           the boundary centroid first ( small |x| -> small rounding of dist ),
+    #                           the shift is added to the float64 nodes ( see check__precision )
+    if ( displacementOnly ):
+        results = np.zeros( (nNodes,alphas.shape[1]), dtype=np.float64 )
+    else:
+        results = np.array( nodes, dtype=np.float64, copy=True )
+    origin      = np.mean( boundaries, axis=0 ) if ( dtype != np.float64 ) else 0.0
+    boundaries  = ( boundaries - origin ).astype( dtype, copy=False )
+    alphas      = np.asarray( alphas ).astype( dtype, copy=False )
+    for iS in range( 0, nNodes, nBlock ):
+        iE           = min( iS+nBlock, nNodes )
+        time1        = time.perf_counter()
+        Rmat         = rbf_func( ( nodes[iS:iE,None,:] - origin ).astype( dtype, copy=False ), \
+                                 boundaries[None,:,:], coef=coef )
+        time1        = add__timing( timings=timings, key="R", time1=time1 )
+        results[iS:iE,:] += np.dot( Rmat, alphas )
+        add__timing( timings=timings, key="apply", time1=time1 )
+    return( results )
+
+
+# ========================================================= #
+# ===  blockwise sparse interpolation ( compact rbf )   === #
+# ========================================================= #
+
+def interpolate__sparse( nodes=None, tree=None, alphas=None, phi_func=phi__wendlandC2, \
+                         coef=1.0, blockSize=None, maxMemory=None, displacementOnly=False, \
+                         dtype=np.float64, radius=None, timings=None ):
 
+    # ------------------------------------------------- #
+    # --- [1] Arguments                             --- #
+    # ------------------------------------------------- #
+    if ( nodes  is None ): raise ValueError( "[interpolate__sparse] nodes  == ???" )
+    if ( tree   is None ): raise ValueError( "[interpolate__sparse] tree   == ???" )
+    if ( alphas is None ): raise ValueError( "[interpolate__sparse] alphas == ???" )
+    nNodes      = nodes.shape[0]
+    nBoundary   = tree.n
+    nBlock      = get__blockSize( nNodes=nNodes, nBoundaries=nBoundary, \
+                                  blockSize=blockSize, maxMemory=maxMemory, \
+                                  itemSize=np.dtype( dtype ).itemsize )
+    
+    # ------------------------------------------------- #
+    # --- [2] R from neighbour search, blockwise    --- #
+    # ------------------------------------------------- #
+    #  -- only node-boundary pairs closer than the support radius ( = coef ) are stored
+    #  -- radius             :: search radius if not coef ( far-field cutoff of the gaussian )
+    #  -- displacementOnly :: returns R @ alphas ( any number of columns, e.g. batched cases )
+    if ( displacementOnly ):
+        results = np.zeros( (nNodes,alphas.shape[1]), dtype=np.float64 )
+    else:
+        results = np.array( nodes, dtype=np.float64, copy=True )
+    alphas      = np.asarray( alphas ).astype( dtype, copy=False )
+    for iS in range( 0, nNodes, nBlock ):
+        iE           = min( iS+nBlock, nNodes )
+        time1        = time.perf_counter()
+        Rmat         = assemble__sparseR( nodes=nodes[iS:iE], tree=tree, phi_func=phi_func, \
+                                          coef=coef, radius=radius, dtype=dtype )
+        time1        = add__timing( timings=timings, key="R", time1=time1 )
+        results[iS:iE,:] += Rmat @ alphas
+        add__timing( timings=timings, key="apply", time1=time1 )
     return( results )
 
+
+def assemble__sparseR( nodes=None, tree=None, phi_func=phi__wendlandC2, coef=1.0, \
+                       radius=None, blockSize=None, maxMemory=None, dtype=np.float64 ):
+    #  -- csr R ( nNodes x M ), neighbour search block by block
+    if ( radius is None ): radius = coef
+    nNodes      = nodes.shape[0]
+    nBlock      = get__blockSize( nNodes=nNodes, nBoundaries=tree.n, \
+                                  blockSize=blockSize, maxMemory=maxMemory )
+    blocks      = []
+    for iS in range( 0, nNodes, nBlock ):
+        iE      = min( iS+nBlock, nNodes )
+        pairs   = cKDTree( nodes[iS:iE] ).sparse_distance_matrix( tree, radius, \
+                                                                  output_type="ndarray" )
+        blocks += [ sps.csr_matrix( ( phi_func( pairs["v"], coef=coef ).astype( dtype ), \
+                                      ( pairs["i"], pairs["j"] ) ), shape=(iE-iS,tree.n) ) ]
+    return( sps.vstack( blocks, format="csr" ) )
+
+
 # ========================================================= #
 # ===   Execution of Pragram                            === #
 # ========================================================= #
@@ -0,0 +1,69 @@
+import os, sys, time
+import numpy              as np
+import morph__rbf         as mph
+import check__meshQuality as cmq
+
+# ========================================================= #
+# ===  morphing with quality check & step subdivision   === #
+# ========================================================= #
+#  -- displacement is applied in nSteps increments ( boundaries move with each step ).
+#  -- if inverted / degenerate tetra appear ( jacobian <= minJacobian ),
+#     nSteps is doubled and the morph is redone from the original nodes.
+
+def morph__stepwise( boundaries=None, displacement=None, nodes=None, cells=None, \
+                     rbfType="gaussian", coef=1.0, minJacobian=0.0, maxSubdivision=4, \
+                     blockSize=None, maxMemory=None, silent=False ):
+
+    # ------------------------------------------------- #
+    # --- [1] Arguments                             --- #
+    # ------------------------------------------------- #
+    if ( boundaries   is None ): sys.exit( "[morph__stepwise.py] boundaries   == ???" )
+    if ( displacement is None ): sys.exit( "[morph__stepwise.py] displacement == ???" )
+    if ( nodes        is None ): sys.exit( "[morph__stepwise.py] nodes        == ???" )
+    if ( cells        is None ): sys.exit( "[morph__stepwise.py] cells        == ???" )
+    reference = cmq.check__meshQuality( points=nodes, cells=cells )
+
+    # ------------------------------------------------- #
+    # --- [2] try 1, 2, 4, ... increments           --- #
+    # ------------------------------------------------- #
+    #  -- reports of all levels are kept ( failed attempts included, see "level" ),
+    #     reports[-1]["passed"] == False :: inverted / degenerate tetra remain
+    reports   = []
+    for level in range( maxSubdivision+1 ):
+        nSteps   = 2**level
+        current  = np.array( nodes     , dtype=np.float64, copy=True )
+        moving   = np.array( boundaries, dtype=np.float64, copy=True )
+        dstep    = np.asarray( displacement, dtype=np.float64 ) / nSteps
+        for step in range( nSteps ):
+            time1    = time.perf_counter()
+            morpher  = mph.RBFMorpher( boundaries=moving, rbfType=rbfType, coef=coef, \
+                                       blockSize=blockSize, maxMemory=maxMemory )
+            current  = morpher.fit( displacement=dstep ).apply( nodes=current )
+            moving  += dstep
+            time2    = time.perf_counter()
+            quality  = cmq.check__meshQuality( points=current, cells=cells, \
+                                               orientation=reference["orientation"] )
+            time3    = time.perf_counter()
+            reports += [ { "level":level, "step":step, "nSteps":nSteps, \
+                           "time_morph":time2-time1, "time_check":time3-time2, \
+                           "nInverted":quality["nInverted"], \
+                           "minJacobian":quality["minJacobian"], \
+                           "maxAspect":quality["maxAspect"], \
+                           "histogram":quality["histogram"], "bins":quality["bins"], \
+                           "passed":bool( quality["minJacobian"] > minJacobian ) } ]
+            if ( not( silent ) ):
+                print( "[morph__stepwise] level={0} step={1}/{2} :: inverted={3} " \
+                       "min(jacobian)={4:.4f} max(aspect)={5:.3f} time={6:.3f} s"\
+                       .format( level, step+1, nSteps, quality["nInverted"], \
+                                quality["minJacobian"], quality["maxAspect"], time3-time1 ) )
+            if ( quality["minJacobian"] <= minJacobian ): break
+        if ( quality["minJacobian"] > minJacobian ):
+            break
+
+    # ------------------------------------------------- #
+    # --- [3] return                                --- #
+    # ------------------------------------------------- #
+    if ( ( quality["minJacobian"] <= minJacobian ) and not( silent ) ):
+        print( "[morph__stepwise] inverted / degenerate tetra remain after {0} steps"\
+               .format( nSteps ) )
+    return( current, reports )
@@ -0,0 +1,241 @@
+import os, sys, time, threading, queue
+import numpy                   as np
+import load__mshFile           as lms
+import extract__boundaryFaces  as ebf
+import morph__rbf              as mph
+import save__nastranFile       as snf
+
+# ========================================================= #
+# ===  streaming morph :: msh -> rbf -> bdf             === #
+# ========================================================= #
+#  -- setup  :: load msh, select boundaries, evaluate displacement, factorize & fit.
+#  -- stream :: threads connected by bounded queues ( depth = queueSize chunks ) ::
+#       read    -> node chunks                   ( points of the mesh )
+#       morph   -> nodes + R @ alpha per chunk   ( numpy releases the GIL in exp / GEMM )
+#       format  -> GRID text per chunk           ( format__grid )
+#       tetra   -> CTETRA text per chunk         ( format__ctetra, runs ahead of the writer )
+#       write   -> header, GRID, CTETRA, ENDDATA ( same layout as save__nastranFile )
+#  -- boundary spec :: "<selector>[=<dx>,<dy>,<dz>]",  numpy expressions of x, y, z, r
+#       plane:nx,ny,nz      exterior patch with this outward normal ( find__patchByNormal )
+#       interface:p1_p2     exterior:p     surface:tag     patch:k
+#     e.g.  "interface:301_302=0,0,0.15*(1-(r/1.05)**2)"   ( no "=" :: fixed, zero displacement )
+
+def morph__stream( mshFile=None, boundarySpecs=None, outFile="out.bdf", rbfType="gaussian", \
+                   coef=1.0, fieldFormat="free", chunkSize=20000, queueSize=4, \
+                   featureAngle=30.0, silent=False, **kwargs ):
+
+    # ------------------------------------------------- #
+    # --- [1] Arguments                             --- #
+    # ------------------------------------------------- #
+    if ( mshFile       is None ): sys.exit( "[morph__stream.py] mshFile       == ???" )
+    if ( boundarySpecs is None ): sys.exit( "[morph__stream.py] boundarySpecs == ???" )
+    stats   = { key:{ "time":0.0, "items":0, "bytes":0 } \
+                for key in [ "read", "setup", "morph", "format", "tetra", "write" ] }
+    time0   = time.perf_counter()
+
+    # ------------------------------------------------- #
+    # --- [2] mesh, boundaries & fit                --- #
+    # ------------------------------------------------- #
+    mesh    = lms.load__mshFile( mshFile=mshFile )
+    points, cells, physnums = mesh["points"], mesh["cells"], mesh["physnums"]
+    stats["read"]["time"] += time.perf_counter() - time0
+    time1   = time.perf_counter()
+    boundary= ebf.extract__boundaryFaces( cells=cells, physnums=physnums, points=points, \
+                                          featureAngle=featureAngle, faces=mesh["faces"], \
+                                          faceEntities=mesh["faceEntities"], mshFile=mshFile )
+    index, displacement = select__boundaries( boundary=boundary, points=points, \
+                                              boundarySpecs=boundarySpecs )
+    morpher = mph.RBFMorpher( boundaries=points[index], rbfType=rbfType, coef=coef, **kwargs )
+    morpher.fit( displacement=displacement )
+    stats["setup"]["time"]  = time.perf_counter() - time1
+    stats["setup"]["items"] = index.size
+
+    # ------------------------------------------------- #
+    # --- [3] pipeline stages                       --- #
+    # ------------------------------------------------- #
+    queues  = { key:queue.Queue( maxsize=queueSize ) for key in [ "nodes", "moved", "grid", "tetra" ] }
+    stop    = threading.Event()
+    errors  = []
+    nPoints, nCells = points.shape[0], cells.shape[0]
+
+    def read__nodes():
+        for iS in range( 0, nPoints, chunkSize ):
+            time1 = time.perf_counter()
+            chunk = ( iS, np.ascontiguousarray( points[iS:min( iS+chunkSize, nPoints )] ) )
+            record( "read", time1, chunk[1].shape[0], chunk[1].nbytes )
+            put( queues["nodes"], chunk )
+
+    def morph__nodes():
+        for iS,chunk in drain( queues["nodes"] ):
+            time1 = time.perf_counter()
+            moved = morpher.apply( nodes=chunk )
+            record( "morph", time1, moved.shape[0], moved.nbytes )
+            put( queues["moved"], ( iS, moved ) )
+
+    def format__nodes():
+        for iS,moved in drain( queues["moved"] ):
+            time1 = time.perf_counter()
+            text  = snf.format__grid( points=moved, nodeIDs=np.arange( iS+1, iS+moved.shape[0]+1 ), \
+                                      fieldFormat=fieldFormat )
+            record( "format", time1, moved.shape[0], len( text ) )
+            put( queues["grid"], text )
+
+    def format__cells():
+        for iS in range( 0, nCells, chunkSize ):
+            time1 = time.perf_counter()
+            iE    = min( iS+chunkSize, nCells )
+            text  = snf.format__ctetra( cells=cells[iS:iE], matNums=physnums[iS:iE], \
+                                        elemIDs=np.arange( iS+1, iE+1 ), fieldFormat=fieldFormat )
+            record( "tetra", time1, iE-iS, len( text ) )
+            put( queues["tetra"], text )
+
+    def write__bdf():
+        with open( outFile, "w" ) as f:
+            f.write( "$ Generated by save__nastranFile.py\n" )
+            f.write( "BEGIN BULK\n" )
+            for key in [ "grid", "tetra" ]:
+                for text in drain( queues[key] ):
+                    time1 = time.perf_counter()
+                    f.write( text )
+                    record( "write", time1, 1, len( text ) )
+            f.write( "ENDDATA\n" )
+
+    # ------------------------------------------------- #
+    # --- [4] helpers ( sentinel, stop, stats )     --- #
+    # ------------------------------------------------- #
+    lock    = threading.Lock()
+    def record( key, time1, items, nbytes ):
+        with lock:
+            stats[key]["time"]  += time.perf_counter() - time1
+            stats[key]["items"] += items
+            stats[key]["bytes"] += nbytes
+
+    def put( que, item ):
+        #  -- bounded put, gives up if another stage failed
+        while( not( stop.is_set() ) ):
+            try:
+                que.put( item, timeout=0.1 )
+                return()
+            except queue.Full:
+                continue
+        raise RuntimeError( "pipeline stopped" )
+
+    def drain( que ):
+        while( True ):
+            try:
+                item = que.get( timeout=0.1 )
+            except queue.Empty:
+                if ( stop.is_set() ): raise RuntimeError( "pipeline stopped" )
+                continue
+            if ( item is None ): return
+            yield( item )
+
+    def run( stage, output ):
+        try:
+            stage()
+            if ( output is not None ): put( queues[output], None )
+        except Exception as error:
+            if ( not( stop.is_set() ) ): errors.append( error )
+            stop.set()
+
+    # ------------------------------------------------- #
+    # --- [5] run                                   --- #
+    # ------------------------------------------------- #
+    time2   = time.perf_counter()
+    stages  = [ ( read__nodes, "nodes" ), ( morph__nodes, "moved" ), ( format__nodes, "grid" ), \
+                ( format__cells, "tetra" ), ( write__bdf, None ) ]
+    threads = [ threading.Thread( target=run, args=stage, daemon=True ) for stage in stages ]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+    if ( len( errors ) > 0 ): raise errors[0]
+    time3   = time.perf_counter()
+
+    # ------------------------------------------------- #
+    # --- [6] throughput report                     --- #
+    # ------------------------------------------------- #
+    report  = { "stages":stats, "time_stream":time3-time2, "time_total":time3-time0, \
+                "nPoints":nPoints, "nCells":nCells, "nBoundary":index.size }
+    if ( not( silent ) ): print__report( report=report )
+    return( report )
+
+
+# ========================================================= #
+# ===  boundary selection & displacement expressions    === #
+# ========================================================= #
+
+def select__boundaries( boundary=None, points=None, boundarySpecs=None ):
+    #  -- a node listed twice keeps the displacement of its first selection
+    indices, displacements = [], []
+    for spec in boundarySpecs:
+        selector, expr = ( spec.split( "=", 1 ) + [ None ] )[0:2]
+        kind, _, value = selector.partition( ":" )
+        if   ( kind == "plane" ):
+            normal = [ float( val ) for val in value.split( "," ) ]
+            index  = ebf.find__patchByNormal( boundary=boundary, normal=normal )
+        elif ( kind in [ "interface", "exterior", "surface", "patch" ] ):
+            key    = "{0}_{1}".format( kind, value )
+            if ( not( key in boundary ) ):
+                sys.exit( "[morph__stream.py] no boundary set :: {0}".format( key ) )
+            index  = np.asarray( boundary[key], dtype=np.int64 )
+        else:
+            sys.exit( "[morph__stream.py] unknown boundary selector :: {0}".format( selector ) )
+        if ( index.size == 0 ):
+            sys.exit( "[morph__stream.py] empty boundary set :: {0}".format( selector ) )
+        indices       += [ index ]
+        displacements += [ evaluate__displacement( expr=expr, pts=points[index] ) ]
+    index, first   = np.unique( np.concatenate( indices ), return_index=True )
+    displacement   = np.concatenate( displacements, axis=0 )[first]
+    return( index, displacement )
+
+
+def evaluate__displacement( expr=None, pts=None ):
+    if ( expr is None ): return( np.zeros_like( pts ) )
+    names  = { "np":np, "pi":np.pi, "sin":np.sin, "cos":np.cos, "exp":np.exp, "sqrt":np.sqrt, \
+               "x":pts[:,0], "y":pts[:,1], "z":pts[:,2], \
+               "r":np.sqrt( pts[:,0]**2 + pts[:,1]**2 ) }
+    value  = eval( "(" + expr + ",)", { "__builtins__":{} }, names )
+    if ( len( value ) != 3 ):
+        sys.exit( "[morph__stream.py] displacement needs 3 components :: {0}".format( expr ) )
+    return( np.stack( [ np.broadcast_to( np.asarray( val, dtype=np.float64 ), \
+                                         ( pts.shape[0], ) ) for val in value ], axis=1 ) )
+
+
+def print__report( report=None ):
+    print( "[morph__stream] points={0} cells={1} boundaries={2}"\
+           .format( report["nPoints"], report["nCells"], report["nBoundary"] ) )
+    for key,stat in report["stages"].items():
+        rate = stat["items"] / stat["time"] if ( stat["time"] > 0.0 ) else 0.0
+        mbps = stat["bytes"] / 1024**2 / stat["time"] if ( stat["time"] > 0.0 ) else 0.0
+        print( "  {0:<7s} :: {1:9.3f} s  {2:10d} items  {3:12.1f} items/s  {4:9.1f} MB/s"\
+               .format( key, stat["time"], stat["items"], rate, mbps ) )
+    busy = sum( report["stages"][key]["time"] for key in [ "morph", "format", "tetra", "write" ] )
+    print( "  stream  :: {0:9.3f} s wall  ( sum of stage times {1:.3f} s )"\
+           .format( report["time_stream"], busy ) )
+    print( "  total   :: {0:9.3f} s".format( report["time_total"] ) )
+
+
+# ========================================================= #
+# ===   Execution of Pragram                            === #
+# ========================================================= #
+
+if ( __name__=="__main__" ):
+    import argparse
+    parser = argparse.ArgumentParser( description="streaming rbf morph :: msh -> bdf" )
+    parser.add_argument( "mshFile" )
+    parser.add_argument( "--boundary"  , action="append", required=True, \
+                         help='e.g. "plane:0,0,1" or "interface:301_302=0,0,0.15*(1-(r/1.05)**2)"' )
+    parser.add_argument( "--out"       , default="out.bdf" )
+    parser.add_argument( "--format"    , default="free", choices=[ "free", "small", "large" ] )
+    parser.add_argument( "--rbf"       , default="gaussian" )
+    parser.add_argument( "--coef"      , type=float, default=0.1 )
+    parser.add_argument( "--solver"    , default="direct", choices=[ "direct", "cg" ] )
+    parser.add_argument( "--precision" , default="double", choices=[ "double", "single" ] )
+    parser.add_argument( "--cutoff"    , type=float, default=None )
+    parser.add_argument( "--chunk"     , type=int  , default=20000 )
+    parser.add_argument( "--queue"     , type=int  , default=4 )
+    parser.add_argument( "--angle"     , type=float, default=30.0 )
+    args   = parser.parse_args()
+    morph__stream( mshFile=args.mshFile, boundarySpecs=args.boundary, outFile=args.out, \
+                   rbfType=args.rbf, coef=args.coef, fieldFormat=args.format, \
+                   chunkSize=args.chunk, queueSize=args.queue, featureAngle=args.angle, \
+                   solver=args.solver, precision=args.precision, cutoffTolerance=args.cutoff )
@@ -0,0 +1,138 @@
+import os, sys, time, tracemalloc
+
+# ========================================================= #
+# ===  phase timing & memory profile of morph__rbf      === #
+# ========================================================= #
+#  -- usage ::
+#       with MorphProfile( log=True ) as profile:
+#           results = mph.morph__rbf( ..., profile=profile )
+#       profile.report  ->  { "phases":[ { name, time, allocated, peak }, ... ],
+#                             "info":{ G / R sizes, factorType, condition, cg_* ( solver="cg" ), ... },
+#                             "time":total }
+#  -- memory :: tracemalloc ( numpy buffers included ), allocated = net bytes kept by the phase,
+#               peak = highest traced memory above the phase start.  tracing slows python code,
+#               memory=False keeps timing only ( "with profile" traces once for all phases ).
+#  -- disabled ( profile=None ) :: NullProfile, a phase is a shared no-op context.
+
+class MorphProfile:
+
+    # ------------------------------------------------- #
+    # --- constructor                               --- #
+    # ------------------------------------------------- #
+    def __init__( self, memory=True, log=False, callback=None ):
+        self.enabled  = True
+        self.memory   = memory
+        self.log      = log
+        self.callback = callback
+        self.phases   = []
+        self.info     = {}
+        self.started  = False
+
+    def __enter__( self ):
+        self.start()
+        return( self )
+
+    def __exit__( self, *args ):
+        self.stop()
+        return( False )
+
+    def start( self ):
+        if ( self.memory and not( tracemalloc.is_tracing() ) ):
+            tracemalloc.start()
+            self.started = True
+
+    def stop( self ):
+        if ( self.started ):
+            tracemalloc.stop()
+            self.started = False
+
+    # ------------------------------------------------- #
+    # --- phase : timed / traced block              --- #
+    # ------------------------------------------------- #
+    def phase( self, name=None ):
+        return( _Phase( profile=self, name=name ) )
+
+    def record( self, entry=None ):
+        self.phases += [ entry ]
+        if ( self.log ):
+            print( "[morph__rbf] {0:<20s} :: {1:9.4f} s  allocated={2:10.3f} MB  peak={3:10.3f} MB"\
+                   .format( entry["name"], entry["time"], entry["allocated"] / 1024**2, \
+                            entry["peak"] / 1024**2 ) )
+        if ( self.callback is not None ): self.callback( entry )
+
+    def add( self, **kwargs ):
+        self.info.update( kwargs )
+        if ( self.log ):
+            for key,value in kwargs.items():
+                print( "[morph__rbf] {0:<20s} :: {1}".format( key, value ) )
+
+    # ------------------------------------------------- #
+    # --- report                                    --- #
+    # ------------------------------------------------- #
+    @property
+    def report( self ):
+        return( { "phases":list( self.phases ), "info":dict( self.info ), \
+                  "time":sum( entry["time"] for entry in self.phases ) } )
+
+
+class _Phase:
+
+    def __init__( self, profile=None, name=None ):
+        self.profile = profile
+        self.name    = name
+
+    def __enter__( self ):
+        #  -- outside a "with profile" block each phase traces on its own
+        self.tracing = self.profile.memory
+        self.owner   = self.tracing and not( tracemalloc.is_tracing() )
+        if ( self.owner   ): tracemalloc.start()
+        if ( self.tracing ):
+            tracemalloc.reset_peak()
+            self.memory1 = tracemalloc.get_traced_memory()[0]
+        self.time1   = time.perf_counter()
+        return( self )
+
+    def __exit__( self, *args ):
+        time2        = time.perf_counter()
+        current,peak = tracemalloc.get_traced_memory() if ( self.tracing ) else ( 0, 0 )
+        memory1      = self.memory1 if ( self.tracing ) else 0
+        if ( self.owner ): tracemalloc.stop()
+        self.profile.record( entry={ "name":self.name, "time":time2-self.time1, \
+                                     "allocated":current-memory1, \
+                                     "peak":max( 0, peak-memory1 ) } )
+        return( False )
+
+
+# ========================================================= #
+# ===  disabled profile                                 === #
+# ========================================================= #
+
+class _NullPhase:
+
+    def __enter__( self ):
+        return( self )
+
+    def __exit__( self, *args ):
+        return( False )
+
+
+class NullProfile:
+
+    enabled = False
+    _phase  = _NullPhase()
+
+    def phase( self, name=None ):
+        return( self._phase )
+
+    def add( self, **kwargs ):
+        return()
+
+
+_null = NullProfile()
+
+def get__profile( profile=None ):
+    #  -- None :: disabled,  callable :: MorphProfile( callback=profile ),  else as given
+    if ( profile is None ): return( _null )
+    if ( isinstance( profile, ( MorphProfile, NullProfile ) ) ): return( profile )
+    if ( callable( profile ) ): return( MorphProfile( memory=False, callback=profile ) )
+    raise ValueError( "[profile__rbf] profile must be MorphProfile, callable or None" )
@@ -0,0 +1,65 @@
+import os, sys
+import numpy       as np
+import morph__rbf  as mph
+
+# ========================================================= #
+# ===  greedy reduction of rbf centres                  === #
+# ========================================================= #
+#  -- data-reduction ( Rendall & Allen ) :: start from a small subset, add the boundary
+#     points with the largest interpolation error until max. error < tolerance
+
+def reduce__boundaries( boundaries=None, displacement=None, rbfType="gaussian", coef=1.0, \
+                        tolerance=None, nInitial=8, nAdd=None, maxCentres=None ):
+
+    # ------------------------------------------------- #
+    # --- [1] Arguments                             --- #
+    # ------------------------------------------------- #
+    if ( boundaries   is None ): raise ValueError( "[reduce__boundaries.py] boundaries   == ???" )
+    if ( displacement is None ): raise ValueError( "[reduce__boundaries.py] displacement == ???" )
+    boundaries   = np.asarray( boundaries  , dtype=np.float64 )
+    displacement = np.asarray( displacement, dtype=np.float64 )
+    nBoundary    = boundaries.shape[0]
+    magnitude    = np.sqrt( np.sum( displacement**2, axis=-1 ) )
+    if ( tolerance  is None ): tolerance  = 1.e-3 * max( np.max( magnitude ), 1.e-300 )
+    if ( maxCentres is None ): maxCentres = nBoundary
+    maxCentres   = min( maxCentres, nBoundary )
+    
+    # ------------------------------------------------- #
+    # --- [2] initial subset : farthest points      --- #
+    # ------------------------------------------------- #
+    #  -- start from the largest displacement, then spread over the surface
+    index        = [ int( np.argmax( magnitude ) ) ]
+    dmin         = np.sqrt( np.sum( ( boundaries - boundaries[index[0]] )**2, axis=-1 ) )
+    for ik in range( 1, min( nInitial, maxCentres ) ):
+        index   += [ int( np.argmax( dmin ) ) ]
+        dist     = np.sqrt( np.sum( ( boundaries - boundaries[index[-1]] )**2, axis=-1 ) )
+        dmin     = np.minimum( dmin, dist )
+    index        = np.array( index, dtype=np.int64 )
+    
+    # ------------------------------------------------- #
+    # --- [3] greedy loop                           --- #
+    # ------------------------------------------------- #
+    while( True ):
+        morpher  = mph.RBFMorpher( boundaries=boundaries[index], rbfType=rbfType, coef=coef )
+        morpher.fit( displacement=displacement[index] )
+        approx   = morpher.apply( nodes=boundaries ) - boundaries
+        errors   = np.sqrt( np.sum( ( approx - displacement )**2, axis=-1 ) )
+        #  -- stop criterion on non-centre points ( residual at centres = conditioning of G )
+        errors[index] = -1.0
+        error    = float( max( np.max( errors ), 0.0 ) )
+        if ( ( error <= tolerance ) or ( index.shape[0] >= maxCentres ) ):
+            break
+        #  -- default :: grow the set by ~25% per pass to keep the number of refits small
+        nNew     = nAdd if ( nAdd is not None ) else max( nInitial, index.shape[0] // 4 )
+        nNew     = min( nNew, maxCentres - index.shape[0] )
+        worst    = np.argsort( errors )[::-1][:nNew]
+        worst    = worst[ errors[worst] > tolerance ]
+        if ( worst.size == 0 ): break
+        index    = np.concatenate( [ index, worst ] )
+        
+    # ------------------------------------------------- #
+    # --- [4] return                                --- #
+    # ------------------------------------------------- #
+    ret = { "boundaries":boundaries[index], "displacement":displacement[index], \
+            "index":index, "error":error, "morpher":morpher }
+    return( ret )
@@ -0,0 +1,158 @@
+import os, sys
+import numpy as np
+
+# ========================================================= #
+# ===  save nastran ( bdf ) file  : GRID / CTETRA       === #
+# ========================================================= #
+#  -- records are formatted in bulk, ( fmt * nChunk ) % values, and written per chunk.
+#  -- fieldFormat :: "free"  ( GRID,1,0,x,y,z ),  "small" ( 8 col. ),  "large" ( GRID*, 16 col. )
+
+def save__nastranFile( points=None, cells=None, outFile="out.bdf", matNums=None, \
+                       fieldFormat="free", sidecarFile=None, chunkSize=100000 ):
+
+    # ------------------------------------------------- #
+    # --- [1] Arguments                             --- #
+    # ------------------------------------------------- #
+    if ( points  is None ): sys.exit( "[save__nastranFile.py] points  == ???" )
+    if ( cells   is None ): sys.exit( "[save__nastranFile.py] cells   == ???" )
+    if ( matNums is None ): matNums = np.ones( (cells.shape[0],), dtype=np.int64 )
+    if ( not( fieldFormat.lower() in [ "free", "small", "large" ] ) ):
+        sys.exit( "[save__nastranFile.py] unknown fieldFormat :: {0}".format( fieldFormat ) )
+    fieldFormat = fieldFormat.lower()
+
+    # ------------------------------------------------- #
+    # --- [2] write GRID / CTETRA chunk by chunk    --- #
+    # ------------------------------------------------- #
+    with open( outFile, "w" ) as f:
+        f.write( "$ Generated by save__nastranFile.py\n" )
+        f.write( "BEGIN BULK\n" )
+        for iS in range( 0, points.shape[0], chunkSize ):
+            iE = min( iS+chunkSize, points.shape[0] )
+            f.write( format__grid( points=points[iS:iE], nodeIDs=np.arange( iS+1, iE+1 ), \
+                                   fieldFormat=fieldFormat ) )
+        for iS in range( 0, cells.shape[0], chunkSize ):
+            iE = min( iS+chunkSize, cells.shape[0] )
+            f.write( format__ctetra( cells=cells[iS:iE], matNums=matNums[iS:iE], \
+                                     elemIDs=np.arange( iS+1, iE+1 ), fieldFormat=fieldFormat ) )
+        f.write( "ENDDATA\n" )
+
+    # ------------------------------------------------- #
+    # --- [3] binary sidecar of coordinates         --- #
+    # ------------------------------------------------- #
+    if ( sidecarFile is not None ):
+        save__sidecar( points=points, cells=cells, matNums=matNums, sidecarFile=sidecarFile )
+    return()
+
+
+# ========================================================= #
+# ===  GRID records                                     === #
+# ========================================================= #
+
+def format__grid( points=None, nodeIDs=None, fieldFormat="free" ):
+
+    nPoints = points.shape[0]
+    if ( nPoints == 0 ): return( "" )
+    if ( nodeIDs is None ): nodeIDs = np.arange( 1, nPoints+1 )
+    if   ( fieldFormat == "free"  ):
+        fmt    = "GRID,%d,0,%15.8e,%15.8e,%15.8e\n"
+        values = np.concatenate( [ nodeIDs[:,None], points ], axis=1 )
+    elif ( fieldFormat == "small" ):
+        fmt    = "GRID    %8d        %8s%8s%8s\n"
+        values = np.empty( (nPoints,4), dtype=object )
+        values[:,0 ] = nodeIDs
+        values[:,1:] = format__real8( values=points )
+    elif ( fieldFormat == "large" ):
+        fmt    = "GRID*   %16d                %16.8e%16.8e\n*       %16.8e\n"
+        values = np.concatenate( [ nodeIDs[:,None], points ], axis=1 )
+    return( ( fmt * nPoints ) % tuple( values.ravel().tolist() ) )
+
+
+# ========================================================= #
+# ===  CTETRA records                                   === #
+# ========================================================= #
+
+def format__ctetra( cells=None, matNums=None, elemIDs=None, fieldFormat="free" ):
+
+    nCells  = cells.shape[0]
+    if ( nCells == 0 ): return( "" )
+    if ( elemIDs is None ): elemIDs = np.arange( 1, nCells+1 )
+    if   ( fieldFormat == "free"  ):
+        fmt = "CTETRA,%d,%d,%d,%d,%d,%d\n"
+    elif ( fieldFormat == "small" ):
+        fmt = "CTETRA  %8d%8d%8d%8d%8d%8d\n"
+    elif ( fieldFormat == "large" ):
+        fmt = "CTETRA* %16d%16d%16d%16d\n*       %16d%16d\n"
+    values  = np.concatenate( [ elemIDs[:,None], np.asarray( matNums )[:,None], \
+                                cells[:,0:4]+1 ], axis=1 ).astype( np.int64 )
+    return( ( fmt * nCells ) % tuple( values.ravel().tolist() ) )
+
+
+# ========================================================= #
+# ===  8 column real field  ( .1234568 / 1.2346+5 )     === #
+# ========================================================= #
+
+def format__real8( values=None ):
+
+    #  -- fixed point if it keeps at least as many significant digits as the compressed
+    #     exponent form ( 0.123456789 -> .1234568, 123.456789 -> 123.4568, 1.e-5 -> 1.0000-5 ).
+    #  -- values are grouped by format ( "%.{p}f" / "%.{p}e" ), each group is formatted by one
+    #     ( fmt * n ) % values call; rounding that overflows 8 columns ( 9.9999999 ) is redone
+    #     with one digit less.
+    values = np.asarray( values, dtype=np.float64 )
+    flat   = values.ravel()
+    ret    = np.full( flat.shape, "0.", dtype="<U8" )
+    absval = np.abs( flat )
+    nonzero= np.nonzero( absval > 0.0 )[0]
+    sign   = ( flat[nonzero] < 0.0 ).astype( np.int64 )
+    intDig = np.floor( np.log10( absval[nonzero] ) ).astype( np.int64 ) + 1
+    #  -- fixed  :: width = sign + max(intDig,0) + 1 + p,   significant digits = p + intDig
+    #  -- expon. :: width = sign + 3 + p + len(exponent),    significant digits = p + 1
+    pFix   = 7 - sign - np.maximum( intDig, 0 )
+    expDig = np.where( np.abs( intDig-1 ) >= 100, 3, np.where( np.abs( intDig-1 ) >= 10, 2, 1 ) )
+    pExp   = 5 - sign - expDig
+    fixed  = ( pFix >= 0 ) & ( pFix + intDig >= pExp + 1 )
+    prec   = np.where( fixed, pFix, pExp )
+    todo   = np.arange( nonzero.size )
+    while( todo.size > 0 ):
+        retry = []
+        for isFixed in [ True, False ]:
+            for pp in np.unique( prec[todo][ fixed[todo] == isFixed ] ):
+                group = todo[ ( fixed[todo] == isFixed ) & ( prec[todo] == pp ) ]
+                strs  = format__group( values=flat[nonzero[group]], prec=pp, isFixed=isFixed )
+                over  = ( np.char.str_len( strs ) > 8 )
+                ret[nonzero[group[~over]]] = strs[~over]
+                retry+= [ group[over] ]
+        todo  = np.concatenate( retry ) if ( len( retry ) > 0 ) else todo[0:0]
+        prec[todo] -= 1
+        #  -- fixed point without room for a digit after rounding :: exponent form
+        switch = todo[ fixed[todo] & ( prec[todo] < 0 ) ]
+        fixed[switch], prec[switch] = False, pExp[switch]
+    return( ret.reshape( values.shape ) )
+
+
+def format__group( values=None, prec=0, isFixed=True ):
+    if ( isFixed ):
+        fmt  = "%#.{0}f\n".format( prec )
+        text = "\n" + ( fmt * values.size ) % tuple( values.tolist() )
+        text = text.replace( "\n0.", "\n." ).replace( "\n-0.", "\n-." )
+    else:
+        fmt  = "%.{0}e\n".format( max( prec, 0 ) )
+        text = "\n" + ( fmt * values.size ) % tuple( values.tolist() )
+        for old,new in [ ( "e+0", "+" ), ( "e-0", "-" ), ( "e+", "+" ), ( "e-", "-" ) ]:
+            text = text.replace( old, new )
+    return( np.array( text[1:-1].split( "\n" ), dtype="<U16" ) )
+
+
+# ========================================================= #
+# ===  binary sidecar  ( .npz / .npy / raw float64 )    === #
+# ========================================================= #
+
+def save__sidecar( points=None, cells=None, matNums=None, sidecarFile=None ):
+    ext = os.path.splitext( sidecarFile )[1].lower()
+    if   ( ext == ".npz" ):
+        np.savez( sidecarFile, points=points, cells=cells, matNums=matNums )
+    elif ( ext == ".npy" ):
+        np.save ( sidecarFile, np.asarray( points, dtype=np.float64 ) )
+    else:
+        np.asarray( points, dtype="<f8" ).tofile( sidecarFile )
+    return()
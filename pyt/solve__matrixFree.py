@@ -0,0 +1,145 @@
+import numpy        as np
+import scipy.linalg as sla
+import morph__rbf   as mph
+
+# ========================================================= #
+# ===  matrix-free preconditioned CG for  G @ x = rhs   === #
+# ========================================================= #
+#  -- G is never stored :: G @ v is evaluated tile by tile ( tile x M kernel block ).
+#  -- preconditioner    :: block-Jacobi, Cholesky of G on spatial clusters ( <= clusterSize ).
+#  -- all columns of rhs ( x,y,z displacement ) are iterated together, each with its own
+#     step length; a column is frozen once || r || / || rhs || < tolerance.
+
+class BlockJacobi:
+
+    # ------------------------------------------------- #
+    # --- constructor : clusters & local factors    --- #
+    # ------------------------------------------------- #
+    def __init__( self, boundaries=None, rbf_func=None, coef=1.0, clusterSize=256 ):
+        self.clusters = split__clusters( points=boundaries, clusterSize=clusterSize )
+        self.factors  = []
+        for index in self.clusters:
+            pts   = boundaries[index]
+            Gloc  = rbf_func( pts[:,None,:], pts[None,:,:], coef=coef )
+            try:
+                self.factors += [ sla.cho_factor( Gloc, lower=True, check_finite=False ) ]
+            except np.linalg.LinAlgError:
+                #  -- nearly singular local block :: small diagonal shift
+                shift = 1.e-10 * np.trace( Gloc ) / Gloc.shape[0]
+                Gloc += shift * np.eye( Gloc.shape[0] )
+                self.factors += [ sla.cho_factor( Gloc, lower=True, check_finite=False ) ]
+
+    # ------------------------------------------------- #
+    # --- apply  M^-1 @ r                           --- #
+    # ------------------------------------------------- #
+    def apply( self, rvec=None ):
+        zvec = np.empty_like( rvec )
+        for index,factor in zip( self.clusters, self.factors ):
+            zvec[index] = sla.cho_solve( factor, rvec[index], check_finite=False )
+        return( zvec )
+
+
+def split__clusters( points=None, clusterSize=256 ):
+    #  -- recursive bisection along the widest axis ( median split )
+    stack, clusters = [ np.arange( points.shape[0] ) ], []
+    while( len( stack ) > 0 ):
+        index = stack.pop()
+        if ( index.shape[0] <= clusterSize ):
+            clusters += [ index ]
+            continue
+        pts   = points[index]
+        axis  = int( np.argmax( np.max( pts, axis=0 ) - np.min( pts, axis=0 ) ) )
+        order = np.argsort( pts[:,axis], kind="stable" )
+        half  = index.shape[0] // 2
+        stack+= [ index[order[:half]], index[order[half:]] ]
+    return( clusters )
+
+
+# ========================================================= #
+# ===  G @ v  in tiles                                  === #
+# ========================================================= #
+
+tileMemory_default = 16     # [MB] per tile, used if neither tileSize nor maxMemory is given
+
+def multiply__G( boundaries=None, vec=None, rbf_func=None, coef=1.0, tileSize=None, \
+                 maxMemory=None ):
+    #  -- neither knob given :: bounded tile ( G must never be formed as a whole )
+    if ( ( tileSize is None ) and ( maxMemory is None ) ): maxMemory = tileMemory_default
+    nB    = boundaries.shape[0]
+    nTile = mph.get__blockSize( nNodes=nB, nBoundaries=nB, blockSize=tileSize, \
+                                maxMemory=maxMemory )
+    ret   = np.empty_like( vec )
+    for iS in range( 0, nB, nTile ):
+        iE         = min( iS+nTile, nB )
+        ret[iS:iE] = np.dot( rbf_func( boundaries[iS:iE,None,:], boundaries[None,:,:], \
+                                       coef=coef ), vec )
+    return( ret )
+
+
+# ========================================================= #
+# ===  preconditioned CG ( multiple right hand sides )  === #
+# ========================================================= #
+
+def solve__matrixFree( boundaries=None, rhs=None, rbf_func=mph.rbf__gaussian, coef=1.0, \
+                       tolerance=1.e-8, maxIter=1000, clusterSize=256, tileSize=None, \
+                       maxMemory=None, x0=None, preconditioner=None ):
+
+    # ------------------------------------------------- #
+    # --- [1] Arguments                             --- #
+    # ------------------------------------------------- #
+    if ( boundaries is None ): raise ValueError( "[solve__matrixFree.py] boundaries == ???" )
+    if ( rhs        is None ): raise ValueError( "[solve__matrixFree.py] rhs        == ???" )
+    rhs      = np.asarray( rhs, dtype=np.float64 )
+    vector   = ( rhs.ndim == 1 )
+    if ( vector ): rhs = rhs[:,None]
+    if ( preconditioner is None ):
+        preconditioner = BlockJacobi( boundaries=boundaries, rbf_func=rbf_func, coef=coef, \
+                                      clusterSize=clusterSize )
+    def matvec( vec ):
+        return( multiply__G( boundaries=boundaries, vec=vec, rbf_func=rbf_func, coef=coef, \
+                             tileSize=tileSize, maxMemory=maxMemory ) )
+
+    # ------------------------------------------------- #
+    # --- [2] initial residual ( warm start x0 )    --- #
+    # ------------------------------------------------- #
+    bnorm    = np.linalg.norm( rhs, axis=0 )
+    bnorm    = np.where( bnorm > 0.0, bnorm, 1.0 )
+    if ( x0 is None ):
+        xvec = np.zeros_like( rhs )
+        rvec = rhs.copy()
+    else:
+        xvec = np.array( x0, dtype=np.float64 ).reshape( rhs.shape )
+        rvec = rhs - matvec( xvec )
+    zvec     = preconditioner.apply( rvec )
+    pvec     = zvec.copy()
+    rz       = np.sum( rvec*zvec, axis=0 )
+    history  = [ np.linalg.norm( rvec, axis=0 ) / bnorm ]
+    active   = ( history[-1] >= tolerance )
+
+    # ------------------------------------------------- #
+    # --- [3] iteration                             --- #
+    # ------------------------------------------------- #
+    nIter    = 0
+    while( np.any( active ) and ( nIter < maxIter ) ):
+        nIter   += 1
+        Ap       = np.zeros_like( pvec )
+        Ap[:,active] = matvec( pvec[:,active] )
+        pAp      = np.sum( pvec*Ap, axis=0 )
+        alpha    = np.where( active & ( pAp != 0.0 ), rz / np.where( pAp != 0.0, pAp, 1.0 ), 0.0 )
+        xvec    += alpha[None,:] * pvec
+        rvec    -= alpha[None,:] * Ap
+        history += [ np.linalg.norm( rvec, axis=0 ) / bnorm ]
+        active   = active & ( history[-1] >= tolerance )
+        zvec     = preconditioner.apply( rvec )
+        rzNew    = np.sum( rvec*zvec, axis=0 )
+        beta     = np.where( active & ( rz != 0.0 ), rzNew / np.where( rz != 0.0, rz, 1.0 ), 0.0 )
+        pvec     = zvec + beta[None,:] * pvec
+        rz       = rzNew
+
+    # ------------------------------------------------- #
+    # --- [4] return                                --- #
+    # ------------------------------------------------- #
+    info = { "iterations":nIter, "converged":bool( not( np.any( active ) ) ), \
+             "residuals":np.array( history ), "tolerance":tolerance }
+    if ( vector ): xvec = xvec[:,0]
+    return( xvec, info )